@@ -3,15 +3,28 @@ from .llm_engine.data_models.llm_job.llm_job import LLMJob
 from .llm_engine.data_models.llm_job.llm_job_step import LLMJobStep
 from .llm_engine.data_models.thread.thread import Thread
 from .llm_engine.services.ai_performance_metrics import AIPerformanceMetrics
+from .llm_engine.services.embedding_cache import EmbeddingCache
+from .llm_engine.services.llm_job_queue import LLMJobQueue
+from .llm_engine.services.metrics_exporter import MetricsExporter
 from .llm_engine.services.prompt_handler import PromptHandler
+from .llm_engine.services.response_cache import ResponseCache
+from .llm_engine.services.similarity_index import SimilarityIndex
+from .llm_engine.services.token_estimator import ContextWindowExceededError, TokenEstimator
 from .llm_schema_capable import LLMSchemaCapable
 
 __all__ = [
     "AI",
     "AIPerformanceMetrics",
+    "ContextWindowExceededError",
+    "EmbeddingCache",
     "Thread",
     "LLMJob",
+    "LLMJobQueue",
     "LLMJobStep",
     "LLMSchemaCapable",
+    "MetricsExporter",
     "PromptHandler",
+    "ResponseCache",
+    "SimilarityIndex",
+    "TokenEstimator",
 ]
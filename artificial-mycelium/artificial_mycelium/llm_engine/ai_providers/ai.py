@@ -1,7 +1,12 @@
+import asyncio
+
 from .providers.google.google_provider import GoogleProvider
 from .providers.openai.openai_provider import OpenAIProvider
+from .supports.provider_cascade import ProviderCascade
+from .supports.provider_router import ProviderRouter
 from ..data_models.thread.thread import Thread
 from ..services.prompt_handler import PromptHandler
+from ..services.rate_limiter import ProviderRateLimiter
 
 
 class AI:
@@ -10,17 +15,93 @@ class AI:
     def __init__(self, provider, name, **kwargs):
         self._provider = self._providers[provider](name, **kwargs)
 
+    @classmethod
+    def with_fallbacks(cls, *candidates, hedge=True, hedge_after=30.0, **kwargs):
+        ai = cls.__new__(cls)
+        ai._provider = ProviderRouter(
+            [cls._providers[provider](name, **kwargs) for provider, name in candidates],
+            hedge=hedge,
+            hedge_after=hedge_after,
+        )
+        return ai
+
+    @classmethod
+    def cascade(cls, *candidates, accept=None, sort_by_price=True, **kwargs):
+        ai = cls.__new__(cls)
+        ai._provider = ProviderCascade(
+            [cls._providers[provider](name, **kwargs) for provider, name in candidates],
+            accept=accept,
+            sort_by_price=sort_by_price,
+        )
+        return ai
+
+    @staticmethod
+    def escalation_report():
+        return ProviderCascade.escalation_report()
+
+    @classmethod
+    async def warm_up(cls, *candidates):
+        await asyncio.gather(*(cls(provider, name)._provider.warm_up() for provider, name in candidates))
+
     @property
     def name(self):
         return self._provider.configuration_name
 
+    def count_tokens(self, thread):
+        return self._provider.count_tokens(thread)
+
+    def estimate_cost(self, thread, output_tokens=0):
+        return self._provider.estimate_cost(thread, output_tokens)
+
     async def get_response(self, thread, **kwargs):
         return await self._provider.get_response(thread, **kwargs)
 
+    async def stream_response(self, thread, **kwargs):
+        async for item in self._provider.stream_response(thread, **kwargs):
+            yield item
+
+    async def get_responses(
+        self, threads, *, max_concurrency=None, requests_per_minute=None, tokens_per_minute=None, **kwargs
+    ):
+        limiter = ProviderRateLimiter.for_provider(
+            self._provider._metrics_kwargs["provider_name"],
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
+
+        async def run(index, thread):
+            estimated_tokens = self.count_tokens(thread)
+            async with limiter.slot(estimated_tokens):
+                try:
+                    response, metrics = await self.get_response(thread, **kwargs)
+                except Exception as e:
+                    if limiter.is_overload_error(e, getattr(self._provider, "_retryable_errors", ())):
+                        limiter.record(None)
+                    return index, e, None
+                limiter.record(metrics, estimated_tokens)
+            return index, response, metrics
+
+        tasks = [asyncio.create_task(run(index, thread)) for index, thread in enumerate(threads)]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def embed(self, texts, **kwargs):
+        return await self._provider.embed(texts, **kwargs)
+
+    async def get_batch_responses(self, threads, **kwargs):
+        return await self._provider.get_batch_responses(threads, **kwargs)
+
     async def get_response_with_prompt(
         self, *, prompt_location, placeholder_values=None, role="system", response_format=None, **kwargs
     ):
         prompt = PromptHandler.build_prompt(prompt_location=prompt_location, placeholder_values=placeholder_values)
+        if isinstance(self._provider, ProviderCascade):
+            kwargs.setdefault("prompt_key", str(prompt_location))
         return await self.get_response(
             Thread.add_first_message(role=role, text=prompt),
             response_format=response_format,
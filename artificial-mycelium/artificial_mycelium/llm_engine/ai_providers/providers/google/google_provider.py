@@ -6,15 +6,30 @@ import httpx
 
 from dev_pytopia import with_error_handling
 
+from .supports.context_cache_registry import ContextCacheRegistry
 from ..shared.base_provider import BaseProvider
+from ..shared.client_registry import ClientRegistry
 from ....schema_utils import get_json_schema
 
 _MODEL_CONFIGURATIONS = {
-    "3-flash": {"model": "gemini-3-flash-preview", "pricing": {"input": 0.50, "output": 3.00}, "timeout": 360.0},
+    "3-flash": {
+        "model": "gemini-3-flash-preview",
+        "pricing": {"input": 0.50, "output": 3.00, "cached": 0.05},
+        "timeout": 360.0,
+        "context_window": 1_048_576,
+    },
     "2.5-flash-lite": {
         "model": "gemini-2.5-flash-lite",
-        "pricing": {"input": 0.10, "output": 0.40},
+        "pricing": {"input": 0.10, "output": 0.40, "cached": 0.01},
+        "timeout": 60.0,
+        "context_window": 1_048_576,
+        "retry": {"max_attempts": 4, "max_delay": 10.0},
+    },
+    "embedding-001": {
+        "model": "gemini-embedding-001",
+        "pricing": {"input": 0.15},
         "timeout": 60.0,
+        "embedding": {"batch_size": 100},
     },
 }
 
@@ -23,11 +38,19 @@ _MODEL_CONFIGURATIONS = {
 class GoogleProvider(BaseProvider):
     _retryable_errors = (httpx.ConnectError, httpx.RemoteProtocolError, ConnectionResetError, ServerError)
 
-    def __init__(self, configuration_name):
-        super().__init__(configuration_name, _MODEL_CONFIGURATIONS, "GOOGLE_API_KEY")
+    def __init__(self, configuration_name, **kwargs):
+        super().__init__(configuration_name, _MODEL_CONFIGURATIONS, "GOOGLE_API_KEY", **kwargs)
 
     def _initialize_client(self, api_key):
-        return genai.Client(api_key=api_key)
+        return genai.Client(
+            api_key=api_key,
+            http_options=genai.types.HttpOptions(
+                httpx_async_client=httpx.AsyncClient(**ClientRegistry.http_client_options())
+            ),
+        )
+
+    async def _warm_up_client(self):
+        await self.client.aio.models.list()
 
     @classmethod
     def _sanitize_schema(cls, obj, max_enum=64):
@@ -41,19 +64,65 @@ class GoogleProvider(BaseProvider):
             }
         return {k: cls._sanitize_schema(v, max_enum) for k, v in obj.items()}
 
-    def _prepare_request(self, thread, response_format: Any = None, **kwargs) -> tuple[dict[str, Any], dict]:
-        schema = self._sanitize_schema(get_json_schema(response_format))
+    @classmethod
+    def _to_response_schema(cls, schema: dict, response_format: Any) -> dict:
+        return cls._sanitize_schema(schema)
+
+    def _prepare_request(self, thread, response_format: Any = None, **kwargs) -> dict[str, Any]:
+        schema = get_json_schema(response_format, self._to_response_schema)
+        system_instruction, contents = thread.to_google_contents()
         return {
-            "contents": thread.get_concatenated_content(),
+            "contents": contents,
             "config": genai.types.GenerateContentConfig(
-                response_mime_type="application/json", response_json_schema=schema
+                system_instruction=system_instruction,
+                **({"response_mime_type": "application/json", "response_json_schema": schema} if schema else {}),
             )
-            if schema
+            if schema or system_instruction
             else None,
-        }, {}
+            **({"_context_cache": thread} if thread.cacheable_prefix_length else {}),
+        }
+
+    async def _apply_context_cache(self, parameters: dict) -> dict:
+        if not (thread := parameters.get("_context_cache")):
+            return parameters
+        parameters = {k: v for k, v in parameters.items() if k != "_context_cache"}
+        prefix, suffix = thread.split_cacheable_prefix()
+        if not (contents := [m.to_google_content() for m in suffix.get_ordered_messages()]) or not (
+            name := await ContextCacheRegistry.get_or_create(
+                self.client,
+                parameters["model"],
+                thread.get_cacheable_prefix_key(),
+                prefix,
+                thread.cache_ttl_seconds,
+            )
+        ):
+            return parameters
+        config = parameters["config"] or genai.types.GenerateContentConfig()
+        return {
+            **parameters,
+            "contents": contents,
+            "config": config.model_copy(update={"cached_content": name, "system_instruction": None}),
+        }
 
     def _process_response(self, api_response: Any) -> tuple[str, Any]:
         return api_response.text, getattr(api_response, "usage_metadata", None)
 
     async def _create_api_call(self, parameters: dict):
-        return await self.client.aio.models.generate_content(**parameters)
+        return await self.client.aio.models.generate_content(**await self._apply_context_cache(parameters))
+
+    async def _create_embeddings(self, parameters: dict) -> tuple[list[list[float]], int]:
+        response = await self.client.aio.models.embed_content(
+            model=parameters["model"],
+            contents=parameters["texts"],
+            config=genai.types.EmbedContentConfig(output_dimensionality=parameters["dimensions"])
+            if parameters["dimensions"]
+            else None,
+        )
+        tokens = sum(self.token_estimator.count_text(text) for text in parameters["texts"])
+        return [embedding.values for embedding in response.embeddings], tokens
+
+    async def _create_stream(self, parameters: dict):
+        stream = await self.client.aio.models.generate_content_stream(
+            **await self._apply_context_cache(parameters)
+        )
+        return ((chunk.text or "", chunk.usage_metadata) async for chunk in stream)
@@ -0,0 +1,65 @@
+import asyncio
+import time
+from typing import ClassVar
+
+from google import genai
+
+
+class ContextCacheRegistry:
+    REFRESH_MARGIN_SECONDS: ClassVar[float] = 300.0
+    RETRY_UNCACHEABLE_AFTER_SECONDS: ClassVar[float] = 3600.0
+    _entries: ClassVar[dict[tuple[str, str], tuple[str | None, float]]] = {}
+    _locks: ClassVar[dict[tuple[str, str], asyncio.Lock]] = {}
+
+    @classmethod
+    def _usable(cls, model: str, prefix_key: str) -> tuple[bool, str | None, float]:
+        name, expires_at = cls._entries.get((model, prefix_key), (None, 0.0))
+        remaining = expires_at - time.time()
+        return remaining > cls.REFRESH_MARGIN_SECONDS or (name is None and remaining > 0), name, remaining
+
+    @classmethod
+    async def get_or_create(cls, client, model: str, prefix_key: str, prefix, ttl_seconds: int) -> str | None:
+        if (usable := cls._usable(model, prefix_key))[0]:
+            return usable[1]
+        async with cls._locks.setdefault((model, prefix_key), asyncio.Lock()):
+            usable, name, remaining = cls._usable(model, prefix_key)
+            if usable:
+                return name
+            return await cls._refresh(client, model, prefix_key, prefix, ttl_seconds, name, remaining)
+
+    @classmethod
+    async def _refresh(
+        cls, client, model: str, prefix_key: str, prefix, ttl_seconds: int, name: str | None, remaining: float
+    ) -> str | None:
+        try:
+            if name and remaining > 0:
+                await client.aio.caches.update(
+                    name=name, config=genai.types.UpdateCachedContentConfig(ttl=f"{ttl_seconds}s")
+                )
+            else:
+                system_instruction, contents = prefix.to_google_contents(require_contents=False)
+                name = (
+                    await client.aio.caches.create(
+                        model=model,
+                        config=genai.types.CreateCachedContentConfig(
+                            system_instruction=system_instruction, contents=contents or None, ttl=f"{ttl_seconds}s"
+                        ),
+                    )
+                ).name
+        except genai.errors.APIError:
+            cls._entries[(model, prefix_key)] = (None, time.time() + cls.RETRY_UNCACHEABLE_AFTER_SECONDS)
+            return None
+        cls._entries[(model, prefix_key)] = (name, time.time() + ttl_seconds)
+        return name
+
+    @classmethod
+    def snapshot(cls) -> list[dict]:
+        return [
+            {
+                "model": model,
+                "prefix_key": key,
+                "name": name,
+                "expires_in_seconds": round(expires_at - time.time()),
+            }
+            for (model, key), (name, expires_at) in cls._entries.items()
+        ]
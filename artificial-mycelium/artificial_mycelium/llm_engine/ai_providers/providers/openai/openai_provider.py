@@ -3,20 +3,29 @@ import json
 from typing import Any, get_origin
 
 import httpx
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from openai.types.responses import Response
 
 from dev_pytopia import with_error_handling
 
+from .supports.background_response_poller import BackgroundResponsePoller
 from ..shared.base_provider import BaseProvider
-from ....schema_utils import get_json_schema
+from ..shared.client_registry import ClientRegistry
+from ....schema_utils import get_json_schema, loads_json
+from ....services.ai_performance_metrics import AIPerformanceMetrics
+
+_BATCH_PRICE_MULTIPLIER = 0.5
+_BATCH_PENDING_STATUSES = ("validating", "in_progress", "finalizing", "cancelling")
 
 _MODEL_CONFIGURATIONS = {
     name: {
         "model": model,
-        "pricing": {"input": pi, "output": po},
+        "pricing": {"input": pi, "output": po, **({} if bg else {"cached": round(pi / 10, 4)})},
         "timeout": timeout,
+        "context_window": 272_000,
+        "tokenizer": {"encoding": "o200k_base"},
         **({"reasoning": {"effort": effort}} if effort else {}),
-        **({"background": True} if bg else {}),
+        **({"background": True, "retry": {"max_attempts": 2}} if bg else {}),
     }
     for name, model, effort, pi, po, timeout, *bg in [
         ("5-nano", "gpt-5-nano", None, 0.05, 0.40, 360),
@@ -34,31 +43,47 @@ _MODEL_CONFIGURATIONS = {
         ("5.2-pro-high", "gpt-5.2-pro", "high", 21.00, 168.00, 1800, True),
         ("5.2-pro-xhigh", "gpt-5.2-pro", "xhigh", 21.00, 168.00, 1800, True),
     ]
+} | {
+    name: {"model": model, "pricing": {"input": pi}, "timeout": 60.0, "embedding": {"batch_size": 512}}
+    for name, model, pi in [
+        ("embedding-3-small", "text-embedding-3-small", 0.02),
+        ("embedding-3-large", "text-embedding-3-large", 0.13),
+    ]
 }
 
 
 @with_error_handling()
 class OpenAIProvider(BaseProvider):
-    def __init__(self, configuration_name):
-        super().__init__(configuration_name, _MODEL_CONFIGURATIONS, "OPENAI_API_KEY")
+    def __init__(self, configuration_name, **kwargs):
+        super().__init__(configuration_name, _MODEL_CONFIGURATIONS, "OPENAI_API_KEY", **kwargs)
 
     def _initialize_client(self, api_key):
-        return AsyncOpenAI(api_key=api_key, timeout=httpx.Timeout(connect=10.0, read=None, write=10.0, pool=5.0))
+        return AsyncOpenAI(
+            api_key=api_key,
+            timeout=httpx.Timeout(connect=10.0, read=None, write=10.0, pool=5.0),
+            http_client=DefaultAsyncHttpxClient(**ClientRegistry.http_client_options()),
+        )
 
-    def _prepare_request(self, thread, response_format: Any = None, **kwargs) -> tuple[dict[str, Any], dict]:
+    async def _warm_up_client(self):
+        await self.client.models.list()
+
+    def _prepare_request(self, thread, response_format: Any = None, **kwargs) -> dict[str, Any]:
         cfg = self.configuration
         params = {
-            "input": thread.get_concatenated_content(),
+            "input": thread.to_openai_input(),
             **kwargs,
             **({"background": True} if cfg.get("background") else {}),
             **({"reasoning": cfg["reasoning"]} if "reasoning" in cfg else {}),
+            **({"prompt_cache_key": key} if (key := thread.get_cacheable_prefix_key()) else {}),
         }
         if response_format:
-            schema = get_json_schema(response_format)
             params["text"] = {
-                "format": self._to_strict_schema(schema, response_format) if schema else response_format
+                "format": get_json_schema(response_format, self._to_strict_schema) or response_format
             }
-        return params, {"unwrap_items": True} if get_origin(response_format) is list else {}
+        return params
+
+    def _validation_options(self, fmt: Any) -> dict:
+        return {"unwrap_items": True} if get_origin(fmt) is list else {}
 
     @staticmethod
     def _to_strict_schema(schema: dict, response_format: Any) -> dict:
@@ -86,14 +111,94 @@ class OpenAIProvider(BaseProvider):
             "name": "".join(c if c.isalnum() or c in "_-" else "_" for c in name),
         }
 
-    def _process_response(self, api_response: Any, *, unwrap_items=False) -> tuple[str, Any]:
-        text = api_response.output_text
-        return (
-            json.dumps(json.loads(text).get("items", [])) if unwrap_items and text else text
-        ), api_response.usage
+    def _process_response(self, api_response: Any) -> tuple[str, Any]:
+        return api_response.output_text, api_response.usage
 
     async def _create_api_call(self, parameters: dict):
-        response = await self.client.responses.create(**parameters)
-        while response.status in ("queued", "in_progress"):
-            response = await asyncio.sleep(2) or await self.client.responses.retrieve(response.id)
-        return response
+        if not parameters.get("background"):
+            return await self.client.responses.create(**parameters)
+        return await BackgroundResponsePoller.shared(self.client).run(
+            parameters, lambda: self.client.responses.create(**parameters)
+        )
+
+    async def _create_embeddings(self, parameters: dict) -> tuple[list[list[float]], int]:
+        response = await self.client.embeddings.create(
+            model=parameters["model"],
+            input=parameters["texts"],
+            **({"dimensions": parameters["dimensions"]} if parameters["dimensions"] else {}),
+        )
+        return [item.embedding for item in response.data], response.usage.prompt_tokens
+
+    async def _create_stream(self, parameters: dict):
+        stream = await self.client.responses.create(**{**parameters, "background": False}, stream=True)
+        return (
+            (
+                getattr(event, "delta", "") if event.type == "response.output_text.delta" else "",
+                event.response.usage if event.type == "response.completed" else None,
+            )
+            async for event in stream
+        )
+
+    async def get_batch_responses(
+        self, threads, response_format: Any = None, poll_interval: float = 30.0, **kwargs
+    ):
+        track = AIPerformanceMetrics.timer(**self._metrics_kwargs)
+        pricing = {k: v * _BATCH_PRICE_MULTIPLIER for k, v in self.configuration.get("pricing", {}).items()}
+        for thread in threads:
+            self.check_context_window(thread)
+        prepared = [self._prepare_request(thread, response_format, **kwargs) for thread in threads]
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": str(index),
+                    "method": "POST",
+                    "url": "/v1/responses",
+                    "body": {
+                        **{k: v for k, v in request.items() if k != "background"},
+                        "model": self.configuration.get("model", self.configuration_name),
+                    },
+                }
+            )
+            for index, request in enumerate(prepared)
+        ]
+        batch_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()), purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id, endpoint="/v1/responses", completion_window="24h"
+        )
+        while batch.status in _BATCH_PENDING_STATUSES:
+            await asyncio.sleep(poll_interval)
+            batch = await self.client.batches.retrieve(batch.id)
+
+        outputs = {
+            item["custom_id"]: item
+            for file_id in filter(None, (batch.output_file_id, batch.error_file_id))
+            for line in (await self.client.files.content(file_id)).text.splitlines()
+            if line.strip() and (item := loads_json(line))
+        }
+
+        results, options = [], self._validation_options(response_format)
+        for index in range(len(prepared)):
+            item = outputs.get(str(index)) or {
+                "error": {"message": f"Batch {batch.id} returned no result ({batch.status})"}
+            }
+            body = (item.get("response") or {}).get("body") or {}
+            if item.get("error") or (item.get("response") or {}).get("status_code") != 200:
+                track(None, pricing, api_calls=0)
+                results.append(
+                    RuntimeError((item.get("error") or body.get("error") or {}).get("message", str(item)))
+                )
+                continue
+            try:
+                text, usage = self._process_response(Response.model_validate(body))
+            except ValueError as e:
+                track(None, pricing, api_calls=0)
+                results.append(e)
+                continue
+            metrics = track(usage, pricing)
+            try:
+                results.append((self._validate(text, response_format, **options), metrics))
+            except ValueError as e:
+                results.append(e)
+        return results
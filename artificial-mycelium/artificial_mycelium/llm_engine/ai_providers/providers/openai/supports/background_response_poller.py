@@ -0,0 +1,135 @@
+import asyncio
+from contextlib import contextmanager, suppress
+import fcntl
+import hashlib
+import json
+import os
+from pathlib import Path
+import random
+import time
+from typing import Any, Awaitable, Callable, ClassVar, Self
+
+from openai import APIStatusError
+
+from dev_pytopia import Logger
+
+_PENDING_STATUSES = ("queued", "in_progress")
+_RETRYABLE_STATUS_CODES = (408, 409, 429)
+_LOGGER = Logger("ERROR")
+
+
+def _is_permanent(error: BaseException) -> bool:
+    if not isinstance(error, APIStatusError):
+        return False
+    return error.status_code < 500 and error.status_code not in _RETRYABLE_STATUS_CODES
+
+
+class BackgroundResponsePoller:
+    INITIAL_DELAY: ClassVar[float] = 1.0
+    MAX_DELAY: ClassVar[float] = 30.0
+    BACKOFF_FACTOR: ClassVar[float] = 1.5
+    _instances: ClassVar[dict[int, Self]] = {}
+
+    def __init__(self, client, state_path: str | Path | None = None):
+        self.client, self._pending, self._task, self._wake = client, {}, None, asyncio.Event()
+        self._state_path = Path(
+            state_path
+            or os.getenv("OPENAI_BACKGROUND_RESPONSES_PATH")
+            or Path.home() / ".cache" / "artificial_mycelium" / "background_responses.json"
+        )
+        self._response_ids = self._read()
+
+    @classmethod
+    def shared(cls, client) -> Self:
+        if id(client) not in cls._instances:
+            cls._instances[id(client)] = cls(client)
+        return cls._instances[id(client)]
+
+    @staticmethod
+    def request_key(parameters: dict) -> str:
+        return hashlib.sha256(json.dumps(parameters, sort_keys=True, default=str).encode()).hexdigest()
+
+    async def run(self, parameters: dict, create: Callable[[], Awaitable[Any]]) -> Any:
+        key = self.request_key(parameters)
+        if not (response_id := self._response_ids.get(key)):
+            if (response := await create()).status not in _PENDING_STATUSES:
+                return response
+            response_id = response.id
+            self._update(key, response_id)
+        try:
+            response = await self.wait(response_id)
+        except APIStatusError as e:
+            if _is_permanent(e):
+                self._update(key, None)
+            raise
+        self._update(key, None)
+        return response
+
+    async def wait(self, response_id: str) -> Any:
+        if response_id not in self._pending:
+            self._pending[response_id] = {
+                "future": asyncio.get_running_loop().create_future(),
+                "delay": self.INITIAL_DELAY,
+                "next_poll": time.monotonic(),
+            }
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+        self._wake.set()
+        return await asyncio.shield(self._pending[response_id]["future"])
+
+    def notify(self, response_id: str) -> None:
+        if entry := self._pending.get(response_id):
+            entry["next_poll"] = time.monotonic()
+            self._wake.set()
+
+    async def _poll(self) -> None:
+        while self._pending:
+            self._wake.clear()
+            now = time.monotonic()
+            due = [response_id for response_id, entry in self._pending.items() if entry["next_poll"] <= now]
+            results = await asyncio.gather(
+                *(self.client.responses.retrieve(response_id) for response_id in due), return_exceptions=True
+            )
+            for response_id, result in zip(due, results):
+                if _is_permanent(result):
+                    self._pending.pop(response_id)["future"].set_exception(result)
+                elif not isinstance(result, Exception) and result.status not in _PENDING_STATUSES:
+                    self._pending.pop(response_id)["future"].set_result(result)
+                else:
+                    entry = self._pending[response_id]
+                    entry["delay"] = min(self.MAX_DELAY, entry["delay"] * self.BACKOFF_FACTOR)
+                    entry["next_poll"] = time.monotonic() + random.uniform(0.5, 1.0) * entry["delay"]
+            if self._pending:
+                with suppress(asyncio.TimeoutError):
+                    next_poll = min(entry["next_poll"] for entry in self._pending.values())
+                    await asyncio.wait_for(self._wake.wait(), max(0.0, next_poll - time.monotonic()))
+
+    def _read(self) -> dict[str, str]:
+        try:
+            return json.loads(self._state_path.read_text()) if self._state_path.exists() else {}
+        except (OSError, ValueError) as e:
+            _LOGGER.error(f"[BackgroundResponsePoller] Ignoring unreadable state file {self._state_path}: {e}")
+            return {}
+
+    @contextmanager
+    def _locked(self):
+        self._state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._state_path.with_suffix(".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _update(self, key: str, response_id: str | None) -> None:
+        if response_id is None and key not in self._response_ids:
+            return
+        with self._locked():
+            self._response_ids = self._read()
+            if response_id is None:
+                self._response_ids.pop(key, None)
+            else:
+                self._response_ids[key] = response_id
+            temporary = self._state_path.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_text(json.dumps(self._response_ids))
+            os.replace(temporary, self._state_path)
@@ -1,45 +1,204 @@
 import asyncio
+from dataclasses import asdict
 import os
-from typing import Any
+import time
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
 
-from pydantic import TypeAdapter
+import numpy as np
+from pydantic_core import from_json
 
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .client_registry import ClientRegistry
+from .retry_policy import RetryPolicy
+from ....schema_utils import get_json_schema, get_type_adapter, get_validator
 from ....services.ai_performance_metrics import AIPerformanceMetrics
+from ....services.embedding_cache import EmbeddingCache
+from ....services.response_cache import ResponseCache
+from ....services.token_estimator import ContextWindowExceededError, TokenEstimator
 
 
 class BaseProvider:
     _retryable_errors: tuple[type[Exception], ...] = ()
 
-    def __init__(self, configuration_name, model_configurations, api_key_env_var):
+    def __init__(
+        self,
+        configuration_name,
+        model_configurations,
+        api_key_env_var,
+        cache: ResponseCache | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+    ):
         self.configuration_name = configuration_name
         self.configuration = model_configurations.get(configuration_name, {})
-        self.client = self._initialize_client(api_key) if (api_key := os.getenv(api_key_env_var)) else None
+        self.client = (
+            ClientRegistry.get(type(self).__name__, api_key, self._initialize_client)
+            if (api_key := os.getenv(api_key_env_var))
+            else None
+        )
+        self.response_cache, self.embedding_cache = cache, embedding_cache
+        self.retry_policy = RetryPolicy.from_configuration(self.configuration)
+        self.circuit_breaker = CircuitBreaker.for_key(f"{type(self).__name__}:{configuration_name}")
+        self.token_estimator = TokenEstimator.for_configuration(self.configuration)
         self._metrics_kwargs = {
             "model_name": configuration_name,
             "provider_name": type(self).__name__.replace("Provider", ""),
         }
 
+    async def warm_up(self) -> None:
+        if self.client:
+            await self._warm_up_client()
+
+    def count_tokens(self, thread) -> int:
+        return self.token_estimator.count_thread(thread)
+
+    def estimate_cost(self, thread, output_tokens: int = 0) -> float:
+        return self.token_estimator.estimate_cost(thread, self.configuration.get("pricing"), output_tokens)
+
+    def check_context_window(self, thread) -> int:
+        tokens = self.count_tokens(thread)
+        if (limit := self.configuration.get("context_window")) and tokens > limit:
+            raise ContextWindowExceededError(
+                f"{self.configuration_name}: thread needs ~{tokens} input tokens, context window is {limit}"
+            )
+        return tokens
+
     async def get_response(self, thread, **kwargs):
         track, fmt = AIPerformanceMetrics.timer(**self._metrics_kwargs), kwargs.pop("response_format", None)
-        request, post_process = self._prepare_request(thread, fmt, **kwargs)
+        cfg, options = self.configuration.get, self._validation_options(fmt)
+        cache_key = self._build_cache_key(thread, fmt, **kwargs)
+        if cache_key and (text := self.response_cache.get(cache_key)) is not None:
+            metrics = track(None, cfg("pricing"), api_calls=0, response_cache_hits=1)
+            return self._validate(text, fmt, **options), metrics
+        self.check_context_window(thread)
+        request = self._prepare_request(thread, fmt, **kwargs)
         request["model"] = self.configuration.get("model", self.configuration_name)
-        cfg = self.configuration.get
         result, retry_info = await self._execute_with_retry(request, cfg("timeout", 120.0))
         if error := retry_info.pop("error", None):
             track(None, cfg("pricing"), **retry_info)
             raise error
-        text, usage = self._process_response(result, **post_process)
-        metrics = track(usage, cfg("pricing"), **retry_info)
-        return (TypeAdapter(fmt).validate_json(text) if fmt else text), metrics
+        text, usage = self._process_response(result)
+        metrics = track(usage, cfg("pricing"), response_cache_misses=int(bool(cache_key)), **retry_info)
+        value = self._validate(text, fmt, **options)
+        if cache_key and text is not None:
+            self.response_cache.set(cache_key, text)
+        return value, metrics
+
+    def _validation_options(self, fmt: Any) -> dict:
+        return {}
+
+    @staticmethod
+    def _validate(text: str, fmt: Any, unwrap_items: bool = False) -> Any:
+        return get_validator(fmt, unwrap_items)(text) if fmt else text
+
+    async def stream_response(self, thread, *, partial: bool = False, **kwargs):
+        """Yield text deltas (or partial objects when `partial`), then the validated result, then metrics."""
+        track, fmt = AIPerformanceMetrics.timer(**self._metrics_kwargs), kwargs.pop("response_format", None)
+        options = self._validation_options(fmt)
+        self.check_context_window(thread)
+        request = self._prepare_request(thread, fmt, **kwargs)
+        request["model"] = self.configuration.get("model", self.configuration_name)
+        chunks, usage = [], None
+        async for delta, chunk_usage in await self._create_stream(request):
+            usage = chunk_usage or usage
+            if not delta:
+                continue
+            chunks.append(delta)
+            if not (fmt and partial):
+                yield delta
+            elif (parsed := self._parse_partial("".join(chunks), fmt, **options)) is not None:
+                yield parsed
+        metrics = track(usage, self.configuration.get("pricing"))
+        if fmt:
+            yield self._validate("".join(chunks), fmt, **options)
+        yield metrics
+
+    @staticmethod
+    def _parse_partial(text: str, fmt: Any, unwrap_items: bool = False) -> Any:
+        try:
+            data = from_json(text, allow_partial=True)
+            if unwrap_items:
+                data = data.get("items", []) if isinstance(data, dict) else []
+            return get_type_adapter(fmt).validate_python(data, experimental_allow_partial=True)
+        except ValueError:
+            return None
+
+    def _build_cache_key(self, thread, fmt: Any, **kwargs) -> str | None:
+        if not self.response_cache:
+            return None
+        return ResponseCache.build_key(
+            thread.get_concatenated_content(),
+            {"name": self.configuration_name, **self.configuration},
+            get_json_schema(fmt) if fmt else None,
+            **kwargs,
+        )
+
+    async def embed(self, texts: list[str], *, dimensions: int | None = None) -> tuple[np.ndarray, Any]:
+        if not (cfg := self.configuration.get("embedding")):
+            raise ValueError(f"{self.configuration_name} is not an embedding configuration")
+        track, model = AIPerformanceMetrics.timer(**self._metrics_kwargs), self.configuration["model"]
+        keys = [EmbeddingCache.build_key(model, dimensions, text) for text in texts]
+        vectors = self.embedding_cache.get_many(list(set(keys))) if self.embedding_cache else {}
+        missing = list(dict.fromkeys(text for text, key in zip(texts, keys) if key not in vectors))
+        batches = [missing[i : i + cfg["batch_size"]] for i in range(0, len(missing), cfg["batch_size"])]
+        semaphore = asyncio.Semaphore(cfg.get("max_concurrency", 4))
 
-    async def _execute_with_retry(self, params: dict, timeout: float) -> tuple[Any, dict]:
-        retries = []
+        async def run(batch):
+            async with semaphore:
+                return await self._execute_with_retry(
+                    {"model": model, "texts": batch, "dimensions": dimensions},
+                    self.configuration.get("timeout", 120.0),
+                    self._create_embeddings,
+                )
+
+        fresh, tokens, retry_info = {}, 0, {"api_calls": 0, "retry_errors": []}
+        for batch, (result, info) in zip(batches, await asyncio.gather(*(run(batch) for batch in batches))):
+            retry_info["api_calls"] += info["api_calls"]
+            retry_info["retry_errors"] += info["retry_errors"]
+            if error := info.get("error"):
+                track(None, self.configuration.get("pricing"), **retry_info)
+                raise error
+            embeddings, batch_tokens = result
+            tokens += batch_tokens
+            fresh |= {
+                EmbeddingCache.build_key(model, dimensions, text): np.asarray(vector, dtype=np.float32)
+                for text, vector in zip(batch, embeddings)
+            }
+        if fresh and self.embedding_cache:
+            self.embedding_cache.set_many(fresh)
+        vectors |= fresh
+        usage = SimpleNamespace(input_tokens=tokens) if tokens else None
+        metrics = track(usage, self.configuration.get("pricing"), **retry_info)
+        return np.stack([vectors[key] for key in keys]) if keys else np.empty((0, 0), np.float32), metrics
+
+    def resilience_snapshot(self) -> dict:
+        return {"circuit": self.circuit_breaker.snapshot(), "retry_policy": asdict(self.retry_policy)}
+
+    async def _execute_with_retry(
+        self, params: dict, timeout: float, call: Callable[[dict], Awaitable[Any]] | None = None
+    ) -> tuple[Any, dict]:
+        retries, policy, breaker = [], self.retry_policy, self.circuit_breaker
+        deadline = time.monotonic() + policy.deadline_seconds if policy.deadline_seconds else None
         while True:
             try:
-                return await asyncio.wait_for(self._create_api_call(params), timeout), {
-                    "api_calls": len(retries) + 1,
-                    "retry_errors": retries,
-                }
+                breaker.before_call()
+            except CircuitOpenError as e:
+                return None, {"api_calls": len(retries), "retry_errors": retries, "error": e}
+            try:
+                result = await asyncio.wait_for(
+                    (call or self._create_api_call)(params),
+                    timeout if deadline is None else max(0.0, min(timeout, deadline - time.monotonic())),
+                )
             except (asyncio.TimeoutError, *self._retryable_errors) as e:
+                breaker.record_failure()
                 retries.append(type(e).__name__)
-                await asyncio.sleep(2 ** len(retries))
+                delay = policy.delay(len(retries))
+                if len(retries) >= policy.max_attempts or (deadline and time.monotonic() + delay >= deadline):
+                    return None, {"api_calls": len(retries), "retry_errors": retries, "error": e}
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                breaker.abort_call()
+                raise
+            breaker.record_success()
+            return result, {"api_calls": len(retries) + 1, "retry_errors": retries}
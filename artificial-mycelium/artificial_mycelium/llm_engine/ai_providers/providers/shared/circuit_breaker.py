@@ -0,0 +1,45 @@
+import time
+from typing import ClassVar, Self
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    FAILURE_THRESHOLD: ClassVar[int] = 5
+    RESET_TIMEOUT_SECONDS: ClassVar[float] = 30.0
+    _instances: ClassVar[dict[str, Self]] = {}
+
+    def __init__(self, name: str):
+        self.name, self.state, self.failures, self.opened_at, self._trial_in_flight = name, "closed", 0, 0.0, False
+
+    @classmethod
+    def for_key(cls, name: str) -> Self:
+        return cls._instances.setdefault(name, cls(name))
+
+    @classmethod
+    def snapshots(cls) -> list[dict]:
+        return [breaker.snapshot() for breaker in cls._instances.values()]
+
+    def before_call(self) -> None:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.RESET_TIMEOUT_SECONDS:
+            self.state, self._trial_in_flight = "half_open", False
+        if self.state == "open" or (self.state == "half_open" and self._trial_in_flight):
+            raise CircuitOpenError(f"Circuit for {self.name} is open after {self.failures} consecutive failures")
+        self._trial_in_flight = self.state == "half_open"
+
+    def record_success(self) -> None:
+        self.state, self.failures, self._trial_in_flight = "closed", 0, False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.FAILURE_THRESHOLD:
+            self.state, self.opened_at, self._trial_in_flight = "open", time.monotonic(), False
+
+    def abort_call(self) -> None:
+        if self._trial_in_flight:
+            self.record_failure()
+
+    def snapshot(self) -> dict:
+        return {"name": self.name, "state": self.state, "failures": self.failures}
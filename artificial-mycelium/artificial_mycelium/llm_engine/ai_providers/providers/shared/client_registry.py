@@ -0,0 +1,24 @@
+from typing import Any, Callable, ClassVar
+
+import httpx
+
+
+class ClientRegistry:
+    LIMITS: ClassVar[httpx.Limits] = httpx.Limits(
+        max_connections=200, max_keepalive_connections=50, keepalive_expiry=120.0
+    )
+    _clients: ClassVar[dict[tuple[str, str], Any]] = {}
+
+    @classmethod
+    def get(cls, provider_name: str, api_key: str, factory: Callable[[str], Any]) -> Any:
+        if (key := (provider_name, api_key)) not in cls._clients:
+            cls._clients[key] = factory(api_key)
+        return cls._clients[key]
+
+    @classmethod
+    def http_client_options(cls) -> dict[str, Any]:
+        return {"http2": True, "limits": cls.LIMITS}
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._clients.clear()
@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+import random
+from typing import Self
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 5
+    deadline_seconds: float | None = None
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    @classmethod
+    def from_configuration(cls, configuration: dict) -> Self:
+        return cls(
+            **{"deadline_seconds": 3 * configuration.get("timeout", 120.0), **configuration.get("retry", {})}
+        )
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
@@ -0,0 +1,80 @@
+from collections import Counter, defaultdict
+from inspect import isawaitable
+from typing import Any, Awaitable, Callable, ClassVar
+
+from ...services.ai_performance_metrics import AIPerformanceMetrics
+
+Acceptance = Callable[[Any], bool | Awaitable[bool]]
+
+
+class ProviderCascade:
+    _stats: ClassVar[defaultdict[str, Counter]] = defaultdict(Counter)
+
+    def __init__(self, providers: list, *, accept: Acceptance | None = None, sort_by_price: bool = True):
+        price = lambda p: sum(p.configuration.get("pricing", {}).get(k, 0.0) for k in ("input", "output"))
+        self.providers, self.accept = sorted(providers, key=price) if sort_by_price else providers, accept
+        self.configuration_name = self.providers[0].configuration_name
+        self._metrics_kwargs = self.providers[0]._metrics_kwargs
+
+    @staticmethod
+    def _label(provider) -> str:
+        return f"{provider._metrics_kwargs['provider_name']}:{provider.configuration_name}"
+
+    def count_tokens(self, thread) -> int:
+        return self.providers[0].count_tokens(thread)
+
+    def estimate_cost(self, thread, output_tokens: int = 0) -> float:
+        return self.providers[0].estimate_cost(thread, output_tokens)
+
+    def stream_response(self, thread, **kwargs):
+        return self.providers[0].stream_response(thread, **kwargs)
+
+    async def embed(self, texts, **kwargs):
+        return await self.providers[0].embed(texts, **kwargs)
+
+    async def get_batch_responses(self, threads, **kwargs):
+        return await self.providers[0].get_batch_responses(threads, **kwargs)
+
+    async def _accepted(self, response: Any, accept: Acceptance | None) -> bool:
+        if (accept := accept or self.accept) is None:
+            return True
+        return bool(await verdict if isawaitable(verdict := accept(response)) else verdict)
+
+    async def get_response(
+        self, thread, *, accept: Acceptance | None = None, prompt_key: str | None = None, **kwargs
+    ):
+        stats, error = self._stats[prompt_key or "default"], None
+        stats["requests"] += 1
+        with AIPerformanceMetrics.collect() as (_, aggregate):
+            for escalations, provider in enumerate(self.providers):
+                stats["escalated"] += escalations == 1
+                stats["escalations"] += bool(escalations)
+                try:
+                    response, _ = await provider.get_response(thread, **kwargs)
+                except Exception as e:
+                    error = e
+                    continue
+                if await self._accepted(response, accept):
+                    stats[f"resolved_by:{self._label(provider)}"] += 1
+                    metrics = aggregate().model_copy(
+                        update={**provider._metrics_kwargs, "winning_candidate": self._label(provider)}
+                    )
+                    metrics.escalations = escalations
+                    return response, metrics
+                error = ValueError(f"{self._label(provider)} response rejected by acceptance check")
+        stats["exhausted"] += 1
+        raise error
+
+    @classmethod
+    def escalation_report(cls) -> dict[str, dict[str, Any]]:
+        return {
+            prompt_key: {
+                "requests": (requests := stats["requests"]),
+                "escalation_rate": stats["escalated"] / requests,
+                "mean_escalations": stats["escalations"] / requests,
+                "exhausted": stats["exhausted"],
+                "resolved_by": {k.split(":", 1)[1]: v for k, v in stats.items() if k.startswith("resolved_by:")},
+            }
+            for prompt_key, stats in cls._stats.items()
+            if stats["requests"]
+        }
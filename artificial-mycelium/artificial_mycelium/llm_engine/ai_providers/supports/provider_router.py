@@ -0,0 +1,102 @@
+import asyncio
+from collections import deque
+from statistics import quantiles
+import time
+from typing import ClassVar, Self
+
+
+class ProviderHealth:
+    MIN_SAMPLES: ClassVar[int] = 20
+    FAILURE_THRESHOLD: ClassVar[int] = 3
+    COOLDOWN_SECONDS: ClassVar[float] = 30.0
+    _instances: ClassVar[dict[str, Self]] = {}
+
+    def __init__(self):
+        self.latencies, self.consecutive_failures, self.last_failure_at = deque(maxlen=200), 0, 0.0
+
+    @classmethod
+    def for_candidate(cls, label: str) -> Self:
+        return cls._instances.setdefault(label, cls())
+
+    @property
+    def healthy(self) -> bool:
+        return (
+            self.consecutive_failures < self.FAILURE_THRESHOLD
+            or time.monotonic() - self.last_failure_at > self.COOLDOWN_SECONDS
+        )
+
+    def p95(self) -> float | None:
+        return quantiles(self.latencies, n=20)[-1] if len(self.latencies) >= self.MIN_SAMPLES else None
+
+    def record_success(self, elapsed: float) -> None:
+        self.latencies.append(elapsed)
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.last_failure_at = time.monotonic()
+
+
+class ProviderRouter:
+    def __init__(self, providers: list, *, hedge: bool = True, hedge_after: float = 30.0):
+        self.providers, self.hedge, self.hedge_after = providers, hedge, hedge_after
+        self.configuration_name = providers[0].configuration_name
+        self._metrics_kwargs = providers[0]._metrics_kwargs
+
+    def count_tokens(self, thread) -> int:
+        return self.providers[0].count_tokens(thread)
+
+    def estimate_cost(self, thread, output_tokens: int = 0) -> float:
+        return self.providers[0].estimate_cost(thread, output_tokens)
+
+    def stream_response(self, thread, **kwargs):
+        return self.providers[0].stream_response(thread, **kwargs)
+
+    async def embed(self, texts, **kwargs):
+        return await self.providers[0].embed(texts, **kwargs)
+
+    async def get_batch_responses(self, threads, **kwargs):
+        return await self.providers[0].get_batch_responses(threads, **kwargs)
+
+    @staticmethod
+    def _label(provider) -> str:
+        return f"{provider._metrics_kwargs['provider_name']}:{provider.configuration_name}"
+
+    async def _attempt(self, provider, thread, **kwargs):
+        health, start = ProviderHealth.for_candidate(self._label(provider)), time.monotonic()
+        try:
+            result = await provider.get_response(thread, **kwargs)
+        except Exception:
+            health.record_failure()
+            raise
+        health.record_success(time.monotonic() - start)
+        return result
+
+    async def get_response(self, thread, **kwargs):
+        candidates = sorted(self.providers, key=lambda p: not ProviderHealth.for_candidate(self._label(p)).healthy)
+        pending, errors = {}, []
+        try:
+            while True:
+                if len(pending) + len(errors) < len(candidates):
+                    provider = candidates[len(pending) + len(errors)]
+                    pending[asyncio.create_task(self._attempt(provider, thread, **kwargs))] = provider
+                delay = (
+                    ProviderHealth.for_candidate(self._label(provider)).p95() or self.hedge_after
+                    if self.hedge and len(pending) + len(errors) < len(candidates)
+                    else None
+                )
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    winner = pending.pop(task)
+                    if (error := task.exception()) is not None:
+                        errors.append(error)
+                        continue
+                    response, metrics = task.result()
+                    metrics.winning_candidate = self._label(winner)
+                    metrics.hedged_requests = len(pending) + len(errors)
+                    return response, metrics
+                if not pending and len(errors) == len(candidates):
+                    raise errors[-1]
+        finally:
+            for task in pending:
+                task.cancel()
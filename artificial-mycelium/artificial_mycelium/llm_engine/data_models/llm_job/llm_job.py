@@ -1,55 +1,144 @@
 from contextlib import asynccontextmanager
 from datetime import UTC, datetime
-from typing import Any, ClassVar
+from typing import Any, Awaitable, Callable, ClassVar
 
 from pydantic import Field
+from pymongo import IndexModel
 
-from database_dimension import MongoDBBaseModel
+from database_dimension import IndexDefinition, MongoDBBaseModel
 
 from .llm_job_step import LLMJobStep
+from .supports.metrics_pipeline import MetricsPipeline
+from .supports.step_write_buffer import StepWriteBuffer
 from ...services.ai_performance_metrics import AIPerformanceMetrics
 
 
 class LLMJob(MongoDBBaseModel):
-    TERMINAL_STATUSES: ClassVar[list[str]] = ["completed"]
+    TERMINAL_STATUSES: ClassVar[list[str]] = ["completed", "failed"]
     DEFAULT_FINAL_STATUS: ClassVar[str] = "completed"
+    QUEUED_STATUS: ClassVar[str] = "queued"
+    RUNNING_STATUS: ClassVar[str] = "running"
+    FAILED_STATUS: ClassVar[str] = "failed"
     SUMMARY_STEP_NAME: ClassVar[str] = "workflow_summary"
+    METRICS_ROLLUP_COLLECTION: ClassVar[str | None] = None
+    indexes: ClassVar[list[IndexDefinition]] = [
+        IndexDefinition("started_at"),
+        IndexDefinition([("user_id", 1), ("started_at", 1)]),
+        IndexDefinition([("status", 1), ("workflow", 1), ("lease_expires_at", 1), ("started_at", 1)]),
+    ]
 
     user_id: str
     steps: dict[str, LLMJobStep] = {}
     started_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    status: str | None = None
+    workflow: str | None = None
+    input_data: dict[str, Any] = {}
+    attempts: int = 0
+    lease_owner: str | None = None
+    lease_expires_at: datetime | None = None
+    last_error: str | None = None
 
     def find_step_data_value(self, key: str) -> Any:
         return next((s.step_data[key] for s in reversed(self.steps.values()) if key in s.step_data), None)
 
+    async def run_step(self, step_name: str, action: Callable[[dict], Awaitable[None]], **extra) -> LLMJobStep:
+        if (step := self.steps.get(step_name)) and step.completed_at:
+            return step
+        async with type(self).track_step(self.id, step_name, **extra) as tracker:
+            await action(tracker)
+            tracker["completed_at"] = datetime.now(UTC)
+        self.steps[step_name] = step = LLMJobStep.model_validate(tracker)
+        return step
+
+    @classmethod
+    def _write_buffer(cls) -> StepWriteBuffer:
+        return StepWriteBuffer.for_model(cls)
+
     @classmethod
     async def set_step(cls, job_id: str, step_name: str, step: LLMJobStep, **extra) -> None:
-        await cls.update_one({"_id": job_id}, {"$set": {f"steps.{step_name}": step.model_dump(), **extra}})
+        cls._write_buffer().set_step(job_id, step_name, step, **extra)
 
     @classmethod
     async def update_step(cls, job_id: str, step_name: str, updates: dict) -> None:
-        await cls.update_one({"_id": job_id}, {"$set": {f"steps.{step_name}.{k}": v for k, v in updates.items()}})
+        cls._write_buffer().update_step(job_id, step_name, updates)
+
+    @classmethod
+    async def flush_steps(cls) -> None:
+        await cls._write_buffer().flush()
 
     @classmethod
     @asynccontextmanager
     async def track_step(cls, job_id: str, step_name: str, **extra):
         await cls.set_step(job_id, step_name, LLMJobStep(), **extra)
-        tracker = {}
+        tracker, failed = {}, False
         try:
             yield tracker
         except Exception as e:
-            tracker["error_message"] = f"{type(e).__name__}: {e}"
+            tracker["error_message"], failed = f"{type(e).__name__}: {e}", True
             raise
         finally:
             if tracker:
                 await cls.update_step(job_id, step_name, tracker)
+            if failed:
+                await cls.flush_steps()
 
     @classmethod
-    async def add_workflow_summary(cls, job_id: str) -> None:
-        if not (job := await cls.find_one(job_id)):
-            return
-        elapsed = (datetime.now(UTC) - job.started_at).total_seconds()
-        metrics = AIPerformanceMetrics.aggregate([s.metrics for s in job.steps.values()], elapsed_time=elapsed)
+    async def add_workflow_summary(cls, job_id: str, started_at: datetime | None = None) -> None:
+        buffer = cls._write_buffer()
+        steps, started_at = buffer.steps.get(job_id, {}), started_at or buffer.started_at.get(job_id)
+        if started_at is None:
+            await buffer.flush()
+            if not (job := await cls.find_one(job_id)):
+                return buffer.discard(job_id)
+            steps, started_at = {**job.steps, **steps}, job.started_at
+        elapsed = (datetime.now(UTC) - started_at).total_seconds()
+        metrics = AIPerformanceMetrics.aggregate([s.metrics for s in steps.values()], elapsed_time=elapsed)
         await cls.set_step(
             job_id, cls.SUMMARY_STEP_NAME, LLMJobStep(metrics=metrics), status=cls.DEFAULT_FINAL_STATUS
         )
+        buffer.discard(job_id)
+        await buffer.flush()
+        if rollup := cls.METRICS_ROLLUP_COLLECTION:
+            pipeline = MetricsPipeline.merge_job_into_rollup(job_id, cls.SUMMARY_STEP_NAME, rollup)
+            await cls.rollup_collection().delete_many({"_id.job": job_id})
+            await (await cls.collection().aggregate(pipeline)).to_list()
+
+    @classmethod
+    def rollup_collection(cls):
+        return cls.collection().database.get_collection(
+            cls.METRICS_ROLLUP_COLLECTION, codec_options=cls._codec_options
+        )
+
+    @classmethod
+    async def ensure_reporting_indexes(cls) -> None:
+        await cls.ensure_indexes()
+        if cls.METRICS_ROLLUP_COLLECTION:
+            await cls.rollup_collection().create_indexes(
+                [
+                    IndexModel([("_id.day", 1)]),
+                    IndexModel([("_id.user", 1), ("_id.day", 1)]),
+                    IndexModel([("_id.job", 1)]),
+                ]
+            )
+
+    @classmethod
+    async def metrics_report(
+        cls,
+        group_by=("model", "provider"),
+        *,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        user_id: str | None = None,
+        use_rollup: bool = False,
+    ):
+        if use_rollup and not cls.METRICS_ROLLUP_COLLECTION:
+            raise ValueError(f"{cls.__name__} has no METRICS_ROLLUP_COLLECTION configured")
+        cursor = await (
+            cls.rollup_collection().aggregate(MetricsPipeline.for_rollup(group_by, since, until, user_id))
+            if use_rollup
+            else cls.collection().aggregate(
+                MetricsPipeline.for_jobs(group_by, cls.SUMMARY_STEP_NAME, since, until, user_id)
+            )
+        )
+        async for document in cursor:
+            yield {**document.pop("_id"), **document}
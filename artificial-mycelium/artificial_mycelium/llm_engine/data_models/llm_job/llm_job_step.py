@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Any
 
 from pydantic import BaseModel
@@ -9,3 +10,4 @@ class LLMJobStep(BaseModel):
     metrics: AIPerformanceMetrics = AIPerformanceMetrics()
     step_data: dict[str, Any] = {}
     error_message: str | None = None
+    completed_at: datetime | None = None
@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Any, ClassVar
+
+from ....services.ai_performance_metrics import AIPerformanceMetrics
+
+
+class MetricsPipeline:
+    NUMERIC_FIELDS: ClassVar[list[str]] = [
+        k for k, v in AIPerformanceMetrics.model_fields.items() if v.annotation in (int, float)
+    ]
+    GROUP_KEYS: ClassVar[dict[str, Any]] = {
+        "model": "$step.v.metrics.model_name",
+        "provider": "$step.v.metrics.provider_name",
+        "user": "$user_id",
+        "day": {"$dateTrunc": {"date": "$started_at", "unit": "day"}},
+    }
+
+    @staticmethod
+    def _time_range(field: str, since: datetime | None, until: datetime | None) -> dict:
+        bounds = {k: v for k, v in (("$gte", since), ("$lt", until)) if v is not None}
+        return {field: bounds} if bounds else {}
+
+    @classmethod
+    def _sums(cls, prefix: str) -> dict:
+        return {field: {"$sum": f"{prefix}{field}"} for field in cls.NUMERIC_FIELDS}
+
+    @classmethod
+    def _unwind_steps(cls, match: dict, summary_step: str) -> list[dict]:
+        return [
+            {"$match": match},
+            {"$project": {"user_id": 1, "started_at": 1, "step": {"$objectToArray": "$steps"}}},
+            {"$unwind": "$step"},
+            {"$match": {"step.k": {"$ne": summary_step}}},
+        ]
+
+    @classmethod
+    def for_jobs(
+        cls, group_by, summary_step: str, since=None, until=None, user_id: str | None = None
+    ) -> list[dict]:
+        match = cls._time_range("started_at", since, until) | ({"user_id": user_id} if user_id else {})
+        return [
+            *cls._unwind_steps(match, summary_step),
+            {
+                "$group": {
+                    "_id": {key: cls.GROUP_KEYS[key] for key in group_by},
+                    "steps": {"$sum": 1},
+                    **cls._sums("$step.v.metrics."),
+                }
+            },
+            {"$sort": {"_id": 1}},
+        ]
+
+    @classmethod
+    def for_rollup(cls, group_by, since=None, until=None, user_id: str | None = None) -> list[dict]:
+        match = cls._time_range("_id.day", since, until) | ({"_id.user": user_id} if user_id else {})
+        return [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": {key: f"$_id.{key}" for key in group_by},
+                    "steps": {"$sum": "$steps"},
+                    **cls._sums("$"),
+                }
+            },
+            {"$sort": {"_id": 1}},
+        ]
+
+    @classmethod
+    def merge_job_into_rollup(cls, job_id: str, summary_step: str, rollup_collection: str) -> list[dict]:
+        pipeline = cls.for_jobs(list(cls.GROUP_KEYS), summary_step)[:-1]
+        pipeline[0] = {"$match": {"_id": job_id}}
+        pipeline[-1]["$group"]["_id"]["job"] = "$_id"
+        return [*pipeline, {"$merge": {"into": rollup_collection, "on": "_id", "whenMatched": "replace"}}]
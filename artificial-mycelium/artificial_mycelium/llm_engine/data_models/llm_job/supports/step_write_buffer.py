@@ -0,0 +1,98 @@
+import asyncio
+from copy import deepcopy
+from datetime import datetime
+from typing import Any, ClassVar, Self
+
+from pymongo import UpdateOne
+
+from dev_pytopia import Logger
+
+from ..llm_job_step import LLMJobStep
+
+_LOGGER = Logger("ERROR")
+
+
+def _merge_set(pending: dict[str, Any], path: str, value: Any) -> None:
+    for existing in [p for p in pending if p.startswith(f"{path}.")]:
+        del pending[existing]
+    if (parent := next((p for p in pending if path.startswith(f"{p}.")), None)) is None or not isinstance(
+        pending[parent], dict
+    ):
+        pending[path] = deepcopy(value) if isinstance(value, dict) else value
+        return
+    target = pending[parent]
+    *keys, last = path[len(parent) + 1 :].split(".")
+    for key in keys:
+        if not isinstance(target.get(key), dict):
+            target[key] = {}
+        target = target[key]
+    target[last] = deepcopy(value) if isinstance(value, dict) else value
+
+
+class StepWriteBuffer:
+    FLUSH_INTERVAL: ClassVar[float] = 1.0
+    MAX_RETRY_INTERVAL: ClassVar[float] = 60.0
+    _instances: ClassVar[dict[type, Self]] = {}
+
+    def __init__(self, model: type):
+        self.model, self._pending, self._task = model, {}, None
+        self.steps: dict[str, dict[str, LLMJobStep]] = {}
+        self.started_at: dict[str, datetime] = {}
+
+    @classmethod
+    def for_model(cls, model: type) -> Self:
+        if model not in cls._instances:
+            cls._instances[model] = cls(model)
+        return cls._instances[model]
+
+    def set_step(self, job_id: str, step_name: str, step: LLMJobStep, **extra) -> None:
+        self.steps.setdefault(job_id, {})[step_name] = step
+        self.set(job_id, {f"steps.{step_name}": step.model_dump(), **extra})
+
+    def update_step(self, job_id: str, step_name: str, updates: dict) -> None:
+        steps = self.steps.setdefault(job_id, {})
+        current = steps.get(step_name, LLMJobStep()).model_dump()
+        steps[step_name] = LLMJobStep.model_validate({**current, **updates})
+        self.set(job_id, {f"steps.{step_name}.{k}": v for k, v in updates.items()})
+
+    def set(self, job_id: str, updates: dict[str, Any]) -> None:
+        pending = self._pending.setdefault(job_id, {})
+        for path, value in updates.items():
+            _merge_set(pending, path, value)
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        delay = self.FLUSH_INTERVAL
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                return await self.flush()
+            except Exception as e:
+                delay = min(delay * 2, self.MAX_RETRY_INTERVAL)
+                _LOGGER.error(
+                    f"[StepWriteBuffer] Deferred flush of {self.model.__name__} failed, retrying in {delay}s: {e}"
+                )
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            await self.model.collection().bulk_write(
+                [UpdateOne({"_id": job_id}, {"$set": updates}) for job_id, updates in pending.items()],
+                ordered=False,
+            )
+        except Exception:
+            for job_id, updates in self._pending.items():
+                for path, value in updates.items():
+                    _merge_set(pending.setdefault(job_id, {}), path, value)
+            self._pending = pending
+            raise
+
+    def seed(self, job_id: str, steps: dict[str, LLMJobStep], started_at: datetime) -> None:
+        self.steps[job_id], self.started_at[job_id] = dict(steps), started_at
+
+    def discard(self, job_id: str) -> None:
+        self.steps.pop(job_id, None)
+        self.started_at.pop(job_id, None)
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 import textwrap
-from typing import Any
+from typing import Any, ClassVar
 
 
 @dataclass
@@ -8,9 +8,20 @@ class TextMessage:
     role: str
     text: str
 
+    OPENAI_ROLES: ClassVar[tuple[str, ...]] = ("system", "developer", "user", "assistant")
+
     def to_dict(self) -> dict[str, Any]:
         return {"role": self.role, "content": self.text or ""}
 
+    def to_openai_input(self) -> dict[str, Any]:
+        return {"role": self.role if self.role in self.OPENAI_ROLES else "user", "content": self.text or ""}
+
+    def to_google_content(self) -> dict[str, Any]:
+        return {
+            "role": "model" if self.role in ("assistant", "model") else "user",
+            "parts": [{"text": self.text or ""}],
+        }
+
     def get_str_representation(self, colors: dict[str, str], width: int) -> list[str]:
         return [
             f"{colors['content']}{w}{colors['reset']}"
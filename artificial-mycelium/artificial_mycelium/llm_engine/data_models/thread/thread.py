@@ -1,6 +1,9 @@
+import hashlib
+from inspect import isawaitable
 import shutil
 
 from .supports.text_message import TextMessage
+from ...services.token_estimator import ContextWindowExceededError
 
 
 class Thread:
@@ -12,8 +15,10 @@ class Thread:
         "reset": "\033[0m",
     }
 
+    SYSTEM_ROLES = ("system", "developer")
+
     def __init__(self):
-        self.messages = []
+        self.messages, self.cacheable_prefix_length, self.cache_ttl_seconds = [], 0, 3600
 
     @classmethod
     def add_first_message(cls, role="user", text=""):
@@ -30,6 +35,52 @@ class Thread:
         self.messages.append(TextMessage(role=role, text=text))
         return self
 
+    def mark_cacheable_prefix(self, ttl_seconds: int = 3600):
+        self.cacheable_prefix_length, self.cache_ttl_seconds = len(self.messages), ttl_seconds
+        return self
+
+    def split_cacheable_prefix(self) -> tuple["Thread", "Thread"]:
+        prefix, suffix = type(self)(), type(self)()
+        prefix.messages = self.messages[: self.cacheable_prefix_length]
+        suffix.messages = self.messages[self.cacheable_prefix_length :]
+        return prefix, suffix
+
+    def get_cacheable_prefix_key(self) -> str | None:
+        if not self.cacheable_prefix_length:
+            return None
+        return hashlib.sha256(self.split_cacheable_prefix()[0].get_concatenated_content().encode()).hexdigest()
+
+    def _without(self, dropped: list[int], summary: str | None = None) -> "Thread":
+        packed = type(self)().mark_cacheable_prefix(self.cache_ttl_seconds)
+        packed.cacheable_prefix_length = self.cacheable_prefix_length
+        for i, message in enumerate(self.messages):
+            if summary is not None and dropped and i == dropped[0]:
+                packed.add_message("user", f"Summary of earlier conversation:\n{summary}")
+            if i not in dropped:
+                packed.messages.append(message)
+        return packed
+
+    async def pack(self, max_tokens: int, count_tokens, summarize=None, summary_tokens: int = 512) -> "Thread":
+        if count_tokens(self) <= max_tokens:
+            return self._without([])
+        pinned = {i for i, m in enumerate(self.messages) if m.role in self.SYSTEM_ROLES}
+        pinned |= set(range(self.cacheable_prefix_length)) | {len(self.messages) - 1}
+        droppable = [i for i in range(len(self.messages)) if i not in pinned]
+        excess, dropped = count_tokens(self) - max_tokens + (summary_tokens if summarize else 0), []
+        empty = count_tokens(type(self)())
+        for i in droppable:
+            if excess <= 0:
+                break
+            excess -= count_tokens(type(self)().add_message(self.messages[i].role, self.messages[i].text)) - empty
+            dropped.append(i)
+        summary = None
+        if summarize and dropped:
+            summary = summarize([self.messages[i] for i in dropped])
+            summary = await summary if isawaitable(summary) else summary
+        if count_tokens(packed := self._without(dropped, summary)) > max_tokens:
+            raise ContextWindowExceededError(f"Thread cannot be packed into {max_tokens} tokens")
+        return packed
+
     def get_printable_representation(self):
         terminal_width = shutil.get_terminal_size().columns
         colors = self.COLORS
@@ -61,3 +112,20 @@ class Thread:
 
     def get_concatenated_content(self, include_roles: bool = True, separator: str = "\n\n") -> str:
         return separator.join((f"{m.role}: " if include_roles else "") + m.text for m in self.messages if m.text)
+
+    def get_ordered_messages(self) -> list[TextMessage]:
+        return [m for m in self.messages if m.text]
+
+    def split_leading_system(self) -> tuple[list[TextMessage], list[TextMessage]]:
+        messages = self.get_ordered_messages()
+        leading = next((i for i, m in enumerate(messages) if m.role not in self.SYSTEM_ROLES), len(messages))
+        return messages[:leading], messages[leading:]
+
+    def to_openai_input(self) -> list[dict]:
+        return [m.to_openai_input() for m in self.get_ordered_messages()]
+
+    def to_google_contents(self, require_contents: bool = True) -> tuple[str | None, list[dict]]:
+        system, rest = self.split_leading_system()
+        if not rest and require_contents:
+            return None, [m.to_google_content() for m in system]
+        return "\n\n".join(m.text for m in system) or None, [m.to_google_content() for m in rest]
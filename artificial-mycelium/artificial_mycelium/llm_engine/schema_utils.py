@@ -1,10 +1,63 @@
-from typing import Any
+from functools import lru_cache
+from importlib.util import find_spec
+import json
+from typing import Any, Callable
 
-from pydantic import TypeAdapter
+from pydantic import TypeAdapter, create_model
 
+if find_spec("orjson"):
+    from orjson import loads as loads_json
+else:
+    loads_json = json.loads
 
-def get_json_schema(fmt: Any) -> dict | None:
+SchemaTransform = Callable[[dict, Any], dict]
+Validator = Callable[[str | bytes], Any]
+
+
+@lru_cache(maxsize=512)
+def _cached_type_adapter(fmt: Any) -> TypeAdapter:
+    return TypeAdapter(fmt)
+
+
+def get_type_adapter(fmt: Any) -> TypeAdapter:
+    try:
+        return _cached_type_adapter(fmt)
+    except TypeError:
+        return TypeAdapter(fmt)
+
+
+def _build_validator(fmt: Any, unwrap_items: bool) -> Validator:
+    if not unwrap_items:
+        return get_type_adapter(fmt).validate_json
+    wrapper = TypeAdapter(create_model("ItemsWrapper", items=(fmt, [])))
+    return lambda text: wrapper.validate_json(text).items
+
+
+_cached_validator = lru_cache(maxsize=512)(_build_validator)
+
+
+def get_validator(fmt: Any, unwrap_items: bool = False) -> Validator:
     try:
-        return TypeAdapter(fmt).json_schema()
+        return _cached_validator(fmt, unwrap_items)
+    except TypeError:
+        return _build_validator(fmt, unwrap_items)
+
+
+def _build_json_schema(fmt: Any, transform: SchemaTransform | None) -> dict | None:
+    try:
+        schema = get_type_adapter(fmt).json_schema()
     except Exception:
         return None
+    return transform(schema, fmt) if transform else schema
+
+
+_cached_json_schema = lru_cache(maxsize=1024)(_build_json_schema)
+
+
+def get_json_schema(fmt: Any, transform: SchemaTransform | None = None) -> dict | None:
+    if fmt is None:
+        return None
+    try:
+        return _cached_json_schema(fmt, transform)
+    except TypeError:
+        return _build_json_schema(fmt, transform)
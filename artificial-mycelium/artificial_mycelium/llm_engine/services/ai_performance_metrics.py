@@ -1,7 +1,7 @@
 from contextlib import contextmanager
 from contextvars import ContextVar
 import time
-from typing import Any, ClassVar, Self
+from typing import Any, Callable, ClassVar, Self
 
 from pydantic import BaseModel
 
@@ -17,11 +17,17 @@ class AIPerformanceMetrics(BaseModel):
     cache_hit_tokens: int = 0
     cache_miss_tokens: int = 0
     api_calls: int = 0
+    response_cache_hits: int = 0
+    response_cache_misses: int = 0
+    hedged_requests: int = 0
+    escalations: int = 0
     model_name: str | None = None
     provider_name: str | None = None
+    winning_candidate: str | None = None
     retry_errors: list[str] = []
 
     _collector: ClassVar[ContextVar[list | None]] = ContextVar("_ai_metrics", default=None)
+    _observers: ClassVar[list[Callable[[Self], None]]] = []
 
     def __repr__(self) -> str:
         return f"Metrics(time={self.elapsed_time_seconds:.2f}s, cost=${self.cost_dollars:.6f}, tokens={self.input_tokens + self.output_tokens}, calls={self.api_calls})"
@@ -52,7 +58,15 @@ class AIPerformanceMetrics(BaseModel):
             attr = lambda *keys: next((v for k in keys if (v := getattr(usage, k, None)) is not None), 0)
             input_tokens = attr("input_tokens", "prompt_tokens", "prompt_token_count")
             output_tokens = attr("output_tokens", "completion_tokens", "candidates_token_count")
-            cache_hit_tokens = attr("prompt_cache_hit_tokens")
+            cache_hit_tokens = (
+                attr("prompt_cache_hit_tokens", "cached_content_token_count")
+                or getattr(
+                    getattr(usage, "input_tokens_details", None) or getattr(usage, "prompt_tokens_details", None),
+                    "cached_tokens",
+                    0,
+                )
+                or 0
+            )
             reasoning_tokens = getattr(
                 getattr(usage, "output_tokens_details", None) or getattr(usage, "completion_tokens_details", None),
                 "reasoning_tokens",
@@ -77,8 +91,15 @@ class AIPerformanceMetrics(BaseModel):
             )
         if (c := cls._collector.get(None)) is not None:
             c.append(metrics)
+        for observer in cls._observers:
+            observer(metrics)
         return metrics
 
+    @classmethod
+    def add_observer(cls, observer: Callable[[Self], None]) -> None:
+        if observer not in cls._observers:
+            cls._observers.append(observer)
+
     @classmethod
     def timer(cls, **kwargs):
         start = time.time()
@@ -93,3 +114,5 @@ class AIPerformanceMetrics(BaseModel):
             yield collected, lambda: cls.aggregate(collected, elapsed_time=time.time() - start)
         finally:
             cls._collector.reset(token)
+            if (parent := cls._collector.get(None)) is not None:
+                parent.extend(collected)
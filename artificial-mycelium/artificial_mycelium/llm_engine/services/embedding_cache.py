@@ -0,0 +1,49 @@
+import hashlib
+from pathlib import Path
+import sqlite3
+
+import numpy as np
+
+__all__ = ["EmbeddingCache"]
+
+
+class EmbeddingCache:
+    def __init__(self, path: str | Path | None = None):
+        path = Path(path or Path.home() / ".cache" / "artificial_mycelium" / "embeddings.sqlite3")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+
+    @staticmethod
+    def build_key(model: str, dimensions: int | None, text: str) -> str:
+        return hashlib.sha256(f"{model}:{dimensions}:{text}".encode()).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            found |= {
+                key: np.frombuffer(blob, dtype=np.float32)
+                for key, blob in self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                )
+            }
+        return found
+
+    def set_many(self, items: dict[str, np.ndarray]) -> None:
+        self._connection.execute("BEGIN")
+        try:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()],
+            )
+        except Exception:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def clear(self) -> None:
+        self._connection.execute("DELETE FROM embeddings")
@@ -0,0 +1,171 @@
+import asyncio
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+import os
+import socket
+from typing import Any, Awaitable, Callable, ClassVar
+from uuid import uuid4
+
+from pymongo import ReturnDocument
+
+from dev_pytopia import Logger
+
+from ..data_models.llm_job.llm_job import LLMJob
+
+Workflow = Callable[[LLMJob], Awaitable[None]]
+
+_LOGGER = Logger("ERROR")
+
+
+class LLMJobQueue:
+    _workflows: ClassVar[dict[str, Workflow]] = {}
+
+    def __init__(
+        self,
+        job_model: type[LLMJob] = LLMJob,
+        *,
+        concurrency: int = 4,
+        lease_seconds: float = 300.0,
+        poll_interval: float = 2.0,
+        max_attempts: int = 5,
+        worker_id: str | None = None,
+    ):
+        self.job_model, self.concurrency, self.max_attempts = job_model, concurrency, max_attempts
+        self.lease, self.poll_interval = timedelta(seconds=lease_seconds), poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._stopping = asyncio.Event()
+
+    @classmethod
+    def workflow(cls, name: str) -> Callable[[Workflow], Workflow]:
+        def register(function: Workflow) -> Workflow:
+            cls._workflows[name] = function
+            return function
+
+        return register
+
+    async def ensure_indexes(self) -> None:
+        await self.job_model.ensure_indexes()
+
+    async def enqueue(
+        self, user_id: str, workflow: str, input_data: dict[str, Any] | None = None, **fields
+    ) -> str:
+        job = self.job_model(
+            user_id=user_id,
+            workflow=workflow,
+            input_data=input_data or {},
+            status=self.job_model.QUEUED_STATUS,
+            **fields,
+        )
+        return await job.save()
+
+    async def fail_exhausted(self, now: datetime | None = None) -> int:
+        model = self.job_model
+        result = await model.update_many(
+            {
+                "workflow": {"$in": list(self._workflows)},
+                "status": model.RUNNING_STATUS,
+                "lease_expires_at": {"$lt": now or datetime.now(UTC)},
+                "attempts": {"$gte": self.max_attempts},
+            },
+            {
+                "$set": {
+                    "status": model.FAILED_STATUS,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "last_error": f"Lease expired after {self.max_attempts} attempts",
+                }
+            },
+        )
+        return result.modified_count
+
+    async def claim(self) -> LLMJob | None:
+        now, model = datetime.now(UTC), self.job_model
+        await self.fail_exhausted(now)
+        document = await model.collection().find_one_and_update(
+            {
+                "workflow": {"$in": list(self._workflows)},
+                "attempts": {"$lt": self.max_attempts},
+                "$or": [
+                    {"status": model.QUEUED_STATUS},
+                    {"status": model.RUNNING_STATUS, "lease_expires_at": {"$lt": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "status": model.RUNNING_STATUS,
+                    "lease_owner": self.worker_id,
+                    "lease_expires_at": now + self.lease,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("started_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return model.model_validate(document) if document else None
+
+    async def _release(self, job: LLMJob, **fields) -> None:
+        await self.job_model.update_one(
+            {"_id": job.id, "lease_owner": self.worker_id},
+            {"$set": {"lease_owner": None, "lease_expires_at": None, **fields}},
+        )
+
+    async def _renew_lease(self, job: LLMJob) -> None:
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                await self.job_model.flush_steps()
+                await self.job_model.update_one(
+                    {"_id": job.id, "lease_owner": self.worker_id},
+                    {"$set": {"lease_expires_at": datetime.now(UTC) + self.lease}},
+                )
+            except Exception as e:
+                _LOGGER.error(f"[LLMJobQueue] Failed to renew lease for job {job.id}: {e}")
+
+    @staticmethod
+    async def _stop_heartbeat(heartbeat: asyncio.Task, job: LLMJob) -> None:
+        heartbeat.cancel()
+        try:
+            await heartbeat
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            _LOGGER.error(f"[LLMJobQueue] Lease heartbeat for job {job.id} died: {e}")
+
+    async def process(self, job: LLMJob) -> None:
+        model = self.job_model
+        model._write_buffer().seed(job.id, job.steps, job.started_at)
+        heartbeat, release = asyncio.create_task(self._renew_lease(job)), {"status": model.QUEUED_STATUS}
+        try:
+            await self._workflows[job.workflow](job)
+            await model.add_workflow_summary(job.id, job.started_at)
+            release = {"last_error": None}
+        except Exception as e:
+            model._write_buffer().discard(job.id)
+            await model.flush_steps()
+            exhausted = job.attempts >= self.max_attempts
+            release = {
+                "status": model.FAILED_STATUS if exhausted else model.QUEUED_STATUS,
+                "last_error": f"{type(e).__name__}: {e}",
+            }
+            _LOGGER.error(f"[LLMJobQueue] Job {job.id} ({job.workflow}) attempt {job.attempts} failed: {e}")
+        finally:
+            await self._stop_heartbeat(heartbeat, job)
+            await self._release(job, **release)
+
+    async def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                if job := await self.claim():
+                    await self.process(job)
+                    continue
+            except Exception as e:
+                _LOGGER.error(f"[LLMJobQueue] Worker {self.worker_id} failed to claim or settle a job: {e}")
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+
+    async def run(self) -> None:
+        self._stopping.clear()
+        await asyncio.gather(*(self._work() for _ in range(self.concurrency)))
+
+    def stop(self) -> None:
+        self._stopping.set()
@@ -0,0 +1,106 @@
+from bisect import bisect_left
+from collections import defaultdict
+from typing import ClassVar, Self
+
+from .ai_performance_metrics import AIPerformanceMetrics
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets, self.counts, self.sum, self.count = buckets, [0] * (len(buckets) + 1), 0.0, 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsExporter:
+    LATENCY_BUCKETS: ClassVar[tuple[float, ...]] = (0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600, 1800)
+    TOKEN_BUCKETS: ClassVar[tuple[float, ...]] = (100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000)
+    HISTOGRAMS: ClassVar[dict[str, tuple[str, tuple[float, ...]]]] = {
+        "ai_request_duration_seconds": ("Wall time of an AI provider request", LATENCY_BUCKETS),
+        "ai_request_input_tokens": ("Input tokens per AI provider request", TOKEN_BUCKETS),
+        "ai_request_output_tokens": ("Output tokens per AI provider request", TOKEN_BUCKETS),
+    }
+    COUNTERS: ClassVar[dict[str, str]] = {
+        "ai_requests_total": "AI provider requests",
+        "ai_api_calls_total": "Upstream API calls including retries",
+        "ai_tokens_total": "Tokens by kind",
+        "ai_cost_dollars_total": "Estimated spend in dollars",
+        "ai_retries_total": "Retried API calls by error type",
+        "ai_response_cache_hits_total": "Requests served from the response cache",
+    }
+    _instance: ClassVar[Self | None] = None
+
+    def __init__(self):
+        self._histograms: dict[tuple[str, _Labels], _Histogram] = {}
+        self._counters: defaultdict[tuple[str, _Labels], float] = defaultdict(float)
+
+    @classmethod
+    def shared(cls) -> Self:
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def install(cls) -> Self:
+        exporter = cls.shared()
+        AIPerformanceMetrics.add_observer(exporter.record)
+        return exporter
+
+    def _observe(self, name: str, labels: _Labels, value: float) -> None:
+        if (histogram := self._histograms.get((name, labels))) is None:
+            histogram = self._histograms[(name, labels)] = _Histogram(self.HISTOGRAMS[name][1])
+        histogram.observe(value)
+
+    def record(self, metrics: AIPerformanceMetrics) -> None:
+        labels = (("model", metrics.model_name or "unknown"), ("provider", metrics.provider_name or "unknown"))
+        counters = self._counters
+        counters[("ai_requests_total", labels)] += 1
+        counters[("ai_api_calls_total", labels)] += metrics.api_calls
+        counters[("ai_cost_dollars_total", labels)] += metrics.cost_dollars
+        counters[("ai_response_cache_hits_total", labels)] += metrics.response_cache_hits
+        for kind in ("input", "output", "reasoning", "cache_hit"):
+            counters[("ai_tokens_total", (*labels, ("kind", kind)))] += getattr(metrics, f"{kind}_tokens")
+        for error in metrics.retry_errors:
+            counters[("ai_retries_total", (*labels, ("error", error)))] += 1
+        if metrics.api_calls:
+            self._observe("ai_request_duration_seconds", labels, metrics.elapsed_time_seconds)
+            self._observe("ai_request_input_tokens", labels, metrics.input_tokens)
+            self._observe("ai_request_output_tokens", labels, metrics.output_tokens)
+
+    @staticmethod
+    def _format_labels(labels: _Labels) -> str:
+        escape = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels) + "}" if labels else ""
+
+    def render(self) -> str:
+        lines = []
+        for name, description in self.COUNTERS.items():
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            lines += [
+                f"{name}{self._format_labels(labels)} {value}"
+                for (metric, labels), value in list(self._counters.items())
+                if metric == name
+            ]
+        for name, (description, buckets) in self.HISTOGRAMS.items():
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+            for (metric, labels), histogram in list(self._histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip((*buckets, "+Inf"), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{self._format_labels((*labels, ('le', str(bound))))} {cumulative}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        self._histograms.clear()
+        self._counters.clear()
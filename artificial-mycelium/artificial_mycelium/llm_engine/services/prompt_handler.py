@@ -1,7 +1,7 @@
 import json
 from pathlib import Path
 import re
-from typing import Any
+from typing import Any, ClassVar
 
 import yaml
 
@@ -10,33 +10,62 @@ from ..schema_utils import get_json_schema
 
 class PromptHandler:
     _PLACEHOLDER_PATTERN = re.compile(r"<<(\w+)>>")
+    _compiled_prompts: ClassVar[dict[Path, tuple[int, dict]]] = {}
 
     @classmethod
-    def _fill_placeholders(cls, text: str, mapping: dict) -> str:
-        return cls._PLACEHOLDER_PATTERN.sub(lambda match: str(mapping.get(match.group(1), match.group(0))), text)
+    def _compile(cls, text: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        parts = cls._PLACEHOLDER_PATTERN.split(text)
+        return tuple(parts[0::2]), tuple(parts[1::2])
+
+    @staticmethod
+    def _render(template: tuple[tuple[str, ...], tuple[str, ...]], mapping: dict) -> str:
+        literals, names = template
+        return literals[0] + "".join(
+            f"{mapping[name] if name in mapping else f'<<{name}>>'}{literal}"
+            for name, literal in zip(names, literals[1:])
+        )
+
+    @classmethod
+    def _compile_prompt(cls, config: dict) -> dict:
+        raw_input = config.get("input")
+        return {
+            "instructions": [
+                cls._compile(
+                    f"{next(iter(item))}: {item[next(iter(item))] or ''}" if isinstance(item, dict) else str(item)
+                )
+                for item in config.get("instructions", [])
+                if item
+            ],
+            "inputs": [
+                cls._compile(str(template))
+                for template in ([raw_input] if not isinstance(raw_input, list) else raw_input)
+                if template
+            ],
+        }
+
+    @classmethod
+    def _load_prompts(cls, path: Path) -> dict:
+        modified = path.stat().st_mtime_ns
+        if (cached := cls._compiled_prompts.get(path)) and cached[0] == modified:
+            return cached[1]
+        prompts = {name: cls._compile_prompt(config) for name, config in yaml.safe_load(path.read_text()).items()}
+        cls._compiled_prompts[path] = (modified, prompts)
+        return prompts
 
     @classmethod
     def build_prompt(cls, prompt_location: tuple, placeholder_values: dict = None) -> str:
         values = placeholder_values or {}
-        config = yaml.safe_load(Path(prompt_location[0]).with_name("prompts.yaml").read_text())[prompt_location[1]]
+        prompt = cls._load_prompts(Path(prompt_location[0]).with_name("prompts.yaml"))[prompt_location[1]]
 
         instructions = [
-            f"- {cls._fill_placeholders(text, values)}"
-            for item in config.get("instructions", [])
-            if item
-            and (
-                text := f"{next(iter(item))}: {item[next(iter(item))] or ''}"
-                if isinstance(item, dict)
-                else str(item)
-            )
-            and all(values.get(token) for token in cls._PLACEHOLDER_PATTERN.findall(text))
+            f"- {cls._render(template, values)}"
+            for template in prompt["instructions"]
+            if all(values.get(name) for name in template[1])
         ]
-        raw_input = config.get("input")
         inputs = [
-            filled
-            for template in ([raw_input] if not isinstance(raw_input, list) else raw_input)
-            if template
-            and not cls._PLACEHOLDER_PATTERN.search(filled := cls._fill_placeholders(str(template), values))
+            cls._render(template, values)
+            for template in prompt["inputs"]
+            if all(name in values for name in template[1])
         ]
 
         parts = [f"{'\n\n'.join(inputs).rstrip()}\n"] if inputs else []
@@ -0,0 +1,94 @@
+import asyncio
+from contextlib import asynccontextmanager
+import time
+from typing import ClassVar, Self
+
+from .ai_performance_metrics import AIPerformanceMetrics
+
+__all__ = ["ProviderRateLimiter", "TokenBucket"]
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity, self.tokens, self._updated = per_minute, per_minute, time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.capacity / 60)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        amount = min(amount, self.capacity)
+        while self._refill() or self.tokens < amount:
+            await asyncio.sleep((amount - self.tokens) * 60 / self.capacity)
+        self.tokens -= amount
+
+    def adjust(self, amount: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ProviderRateLimiter:
+    DEFAULT_LIMITS: ClassVar[dict] = {
+        "max_concurrency": 16,
+        "requests_per_minute": None,
+        "tokens_per_minute": None,
+    }
+    OVERLOAD_STATUS_CODES: ClassVar[tuple[int, ...]] = (429, 503, 529)
+    _instances: ClassVar[dict[str, Self]] = {}
+
+    def __init__(self, max_concurrency: int, requests_per_minute=None, tokens_per_minute=None):
+        self._active, self._condition, self.concurrency = 0, asyncio.Condition(), max_concurrency
+        self._requests: TokenBucket | None = None
+        self._tokens: TokenBucket | None = None
+        self.configure(max_concurrency, requests_per_minute, tokens_per_minute)
+
+    @classmethod
+    def for_provider(cls, provider_name: str, **limits) -> Self:
+        limits = {k: v for k, v in limits.items() if v is not None}
+        if provider_name not in cls._instances:
+            cls._instances[provider_name] = cls(**(cls.DEFAULT_LIMITS | limits))
+        elif limits:
+            cls._instances[provider_name].configure(**limits)
+        return cls._instances[provider_name]
+
+    @staticmethod
+    def _bucket(current: TokenBucket | None, per_minute: float | None) -> TokenBucket | None:
+        if not per_minute or (current and current.capacity == per_minute):
+            return current
+        return TokenBucket(per_minute)
+
+    def configure(self, max_concurrency=None, requests_per_minute=None, tokens_per_minute=None) -> None:
+        if max_concurrency:
+            self.max_concurrency, self.concurrency = max_concurrency, min(self.concurrency, max_concurrency)
+        self._requests = self._bucket(self._requests, requests_per_minute)
+        self._tokens = self._bucket(self._tokens, tokens_per_minute)
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int = 0):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self.concurrency)
+            self._active += 1
+        try:
+            if self._requests:
+                await self._requests.acquire()
+            if self._tokens:
+                await self._tokens.acquire(estimated_tokens)
+            yield
+        finally:
+            async with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    @classmethod
+    def is_overload_error(cls, error: BaseException, retryable: tuple[type[BaseException], ...] = ()) -> bool:
+        status = getattr(error, "status_code", None) or getattr(error, "code", None)
+        return isinstance(error, (asyncio.TimeoutError, *retryable)) or status in cls.OVERLOAD_STATUS_CODES
+
+    def record(self, metrics: AIPerformanceMetrics | None, estimated_tokens: int = 0) -> None:
+        if metrics is None or metrics.retry_errors:
+            self.concurrency = max(1, self.concurrency // 2)
+        else:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+        if self._tokens and metrics:
+            self._tokens.adjust(estimated_tokens - metrics.input_tokens - metrics.output_tokens)
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import time
+from typing import Any
+
+__all__ = ["ResponseCache"]
+
+
+class _MemoryBackend:
+    def __init__(self, max_entries: int):
+        self.max_entries, self._entries = max_entries, OrderedDict()
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        if (entry := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class _SQLiteBackend:
+    def __init__(self, path: str | Path, max_entries: int):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_by_expiry ON responses (expires_at)")
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        return self._connection.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        self._connection.execute("BEGIN")
+        try:
+            self._connection.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        except Exception:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def delete(self, key: str) -> None:
+        self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        self._connection.execute("DELETE FROM responses")
+
+
+class ResponseCache:
+    def __init__(
+        self, backend: str = "memory", *, ttl_seconds: float = 86_400, max_entries: int = 1024, path=None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self._backend = (
+            _SQLiteBackend(
+                path or Path.home() / ".cache" / "artificial_mycelium" / "responses.sqlite3", max_entries
+            )
+            if backend == "sqlite"
+            else _MemoryBackend(max_entries)
+        )
+
+    @staticmethod
+    def build_key(content: str, configuration: dict, schema: dict | None, **request_kwargs) -> str:
+        payload = json.dumps([content, configuration, schema, request_kwargs], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        if not (entry := self._backend.get(key)):
+            return None
+        if entry[1] < time.time():
+            return self._backend.delete(key)
+        return entry[0]
+
+    def set(self, key: str, value: Any) -> None:
+        self._backend.set(key, value, time.time() + self.ttl_seconds)
+
+    def clear(self) -> None:
+        self._backend.clear()
@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+from typing import Self
+
+import numpy as np
+
+__all__ = ["SimilarityIndex"]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    if k >= len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class SimilarityIndex:
+    def __init__(self, ids, vectors: np.ndarray, *, centroids=None, offsets=None, n_probe: int = 8):
+        self.ids, self.vectors = np.asarray(ids), vectors
+        self.centroids, self.offsets, self.n_probe = centroids, offsets, n_probe
+
+    @classmethod
+    def build(cls, ids: list[str], vectors, *, n_lists: int = 0, n_probe: int = 8, iterations: int = 10) -> Self:
+        vectors, ids = _normalize(vectors), np.asarray(ids)
+        if not n_lists or n_lists >= len(vectors):
+            return cls(ids, vectors)
+        rng = np.random.default_rng(0)
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)]
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            empty = np.bincount(assignments, minlength=n_lists) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=n_lists))])
+        return cls(ids[order], vectors[order], centroids=centroids, offsets=offsets, n_probe=n_probe)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _candidates(self, query: np.ndarray) -> np.ndarray | None:
+        if self.centroids is None:
+            return None
+        lists = _top_k(self.centroids @ query, min(self.n_probe, len(self.centroids)))
+        return np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists])
+
+    def search(self, queries, k: int = 10) -> list[list[tuple[str, float]]]:
+        results = []
+        for query in _normalize(queries):
+            if (candidates := self._candidates(query)) is None:
+                candidates = np.arange(len(self.vectors))
+                scores = self.vectors @ query
+            else:
+                scores = self.vectors[candidates] @ query
+            top = _top_k(scores, k)
+            results.append([(str(self.ids[i]), float(score)) for i, score in zip(candidates[top], scores[top])])
+        return results
+
+    def save(self, directory: str | Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "vectors.npy", np.ascontiguousarray(self.vectors))
+        np.save(directory / "ids.npy", self.ids.astype(str))
+        if self.centroids is not None:
+            np.save(directory / "centroids.npy", self.centroids)
+            np.save(directory / "offsets.npy", self.offsets)
+        (directory / "index.json").write_text(json.dumps({"n_probe": self.n_probe, "count": len(self)}))
+
+    @classmethod
+    def load(cls, directory: str | Path, *, mmap: bool = True) -> Self:
+        directory, mode = Path(directory), "r" if mmap else None
+        ivf = (directory / "centroids.npy").exists()
+        return cls(
+            np.load(directory / "ids.npy"),
+            np.load(directory / "vectors.npy", mmap_mode=mode),
+            centroids=np.load(directory / "centroids.npy") if ivf else None,
+            offsets=np.load(directory / "offsets.npy") if ivf else None,
+            n_probe=json.loads((directory / "index.json").read_text())["n_probe"],
+        )
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from functools import cache
+import hashlib
+from importlib.util import find_spec
+import math
+from typing import Any, ClassVar, Self
+
+_HAS_TIKTOKEN = find_spec("tiktoken") is not None
+
+
+class ContextWindowExceededError(ValueError):
+    pass
+
+
+@cache
+def _get_encoding(name: str):
+    import tiktoken
+
+    return tiktoken.get_encoding(name)
+
+
+_COUNT_CACHE_SIZE = 65536
+_counts: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+
+
+def _count_text(encoding: str | None, chars_per_token: float, text: str) -> int:
+    if not (encoding and _HAS_TIKTOKEN):
+        return math.ceil(len(text) / chars_per_token)
+    key = (encoding, hashlib.blake2b(text.encode(), digest_size=16).digest())
+    if (count := _counts.get(key)) is None:
+        _counts[key] = count = len(_get_encoding(encoding).encode(text, disallowed_special=()))
+        if len(_counts) > _COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    else:
+        _counts.move_to_end(key)
+    return count
+
+
+class TokenEstimator:
+    MESSAGE_OVERHEAD: ClassVar[int] = 4
+    REPLY_OVERHEAD: ClassVar[int] = 3
+    _instances: ClassVar[dict[tuple[str | None, float], Self]] = {}
+
+    def __init__(self, encoding: str | None = None, chars_per_token: float = 4.0):
+        self.encoding, self.chars_per_token = encoding, chars_per_token
+
+    @classmethod
+    def for_configuration(cls, configuration: dict[str, Any]) -> Self:
+        tokenizer = configuration.get("tokenizer", {})
+        key = (tokenizer.get("encoding"), tokenizer.get("chars_per_token", 4.0))
+        if key not in cls._instances:
+            cls._instances[key] = cls(*key)
+        return cls._instances[key]
+
+    def count_text(self, text: str) -> int:
+        return _count_text(self.encoding, self.chars_per_token, text or "")
+
+    def count_message(self, message) -> int:
+        return self.MESSAGE_OVERHEAD + self.count_text(message.text)
+
+    def count_thread(self, thread) -> int:
+        return self.REPLY_OVERHEAD + sum(self.count_message(m) for m in thread.messages if m.text)
+
+    def estimate_cost(self, thread, pricing: dict[str, float] | None, output_tokens: int = 0) -> float:
+        pricing = pricing or {}
+        return (
+            self.count_thread(thread) * pricing.get("input", 0.0) + output_tokens * pricing.get("output", 0.0)
+        ) / 1_000_000
@@ -0,0 +1,110 @@
+from datetime import UTC, datetime, timedelta
+
+from bson.codec_options import CodecOptions
+import mongomock
+import pytest
+
+from artificial_mycelium import LLMJob, LLMJobQueue, LLMJobStep
+
+
+class AsyncCollection:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        async def call(*args, **kwargs):
+            return getattr(self._collection, name)(*args, **kwargs)
+
+        return call
+
+    async def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            self._collection.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+
+
+class QueuedJob(LLMJob, database="tests", collection="jobs"):
+    pass
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    collection = mongomock.MongoClient().tests.get_collection("jobs", codec_options=CodecOptions(tz_aware=True))
+    monkeypatch.setattr(QueuedJob, "collection", classmethod(lambda cls: AsyncCollection(collection)))
+    return collection
+
+
+def queue(worker_id: str, **options) -> LLMJobQueue:
+    return LLMJobQueue(QueuedJob, worker_id=worker_id, lease_seconds=60, max_attempts=2, **options)
+
+
+def expire_lease(jobs, job_id: str) -> None:
+    jobs.update_one({"_id": job_id}, {"$set": {"lease_expires_at": datetime.now(UTC) - timedelta(seconds=1)}})
+
+
+@LLMJobQueue.workflow("noop")
+async def noop(job: LLMJob) -> None:
+    pass
+
+
+async def test_claim_leases_a_job_until_it_expires(jobs):
+    job_id = await queue("a").enqueue("u1", "noop")
+    job = await queue("a").claim()
+    assert (job.id, job.status, job.lease_owner, job.attempts) == (job_id, "running", "a", 1)
+    assert await queue("b").claim() is None
+    expire_lease(jobs, job_id)
+    reclaimed = await queue("b").claim()
+    assert (reclaimed.id, reclaimed.lease_owner, reclaimed.attempts) == (job_id, "b", 2)
+
+
+async def test_expired_jobs_without_attempts_left_are_failed(jobs):
+    job_id = await queue("a").enqueue("u1", "noop")
+    for worker in ["a", "b"]:
+        await queue(worker).claim()
+        expire_lease(jobs, job_id)
+    assert await queue("c").claim() is None
+    document = jobs.find_one({"_id": job_id})
+    assert (document["status"], document["lease_owner"]) == ("failed", None)
+    assert document["last_error"] == "Lease expired after 2 attempts"
+
+
+async def test_release_is_fenced_by_the_lease_owner(jobs):
+    job_id = await queue("a").enqueue("u1", "noop")
+    stale = await queue("a").claim()
+    expire_lease(jobs, job_id)
+    await queue("b").claim()
+    await queue("a")._release(stale, status="queued")
+    document = jobs.find_one({"_id": job_id})
+    assert (document["status"], document["lease_owner"]) == ("running", "b")
+
+
+async def test_failed_attempt_requeues_the_job(jobs):
+    @LLMJobQueue.workflow("flaky")
+    async def flaky(job: LLMJob) -> None:
+        raise RuntimeError("boom")
+
+    job_id = await queue("a").enqueue("u1", "flaky")
+    await queue("a").process(await queue("a").claim())
+    document = jobs.find_one({"_id": job_id})
+    assert (document["status"], document["lease_owner"]) == ("queued", None)
+    assert document["last_error"] == "RuntimeError: boom"
+
+
+async def test_resumed_job_skips_completed_steps(jobs):
+    calls = []
+
+    async def record(tracker: dict) -> None:
+        calls.append(len(calls))
+
+    @LLMJobQueue.workflow("two_steps")
+    async def two_steps(job: LLMJob) -> None:
+        await job.run_step("first", record)
+        await job.run_step("second", record)
+
+    done = LLMJobStep(completed_at=datetime.now(UTC)).model_dump()
+    job_id = await queue("a").enqueue("u1", "two_steps", steps={"first": done})
+    await queue("a").process(await queue("a").claim())
+    document = jobs.find_one({"_id": job_id})
+    assert calls == [0]
+    assert document["status"] == "completed"
+    assert document["steps"]["second"]["completed_at"] is not None
+    assert "workflow_summary" in document["steps"]
@@ -0,0 +1,90 @@
+import json
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+import pytest
+
+from artificial_mycelium import Thread
+from artificial_mycelium.llm_engine.ai_providers.providers.openai.openai_provider import OpenAIProvider
+
+
+class Answer(BaseModel):
+    value: int
+
+
+def response_body(text: str) -> dict:
+    return {
+        "id": "resp",
+        "object": "response",
+        "created_at": 0,
+        "model": "gpt-5-nano",
+        "output": [
+            {
+                "type": "message",
+                "id": "msg",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": 10,
+            "output_tokens": 5,
+            "total_tokens": 15,
+            "input_tokens_details": {"cached_tokens": 0, "cache_write_tokens": 0},
+            "output_tokens_details": {"reasoning_tokens": 0},
+        },
+    }
+
+
+class FakeBatchServer:
+    def __init__(self, results: dict[str, dict]):
+        self.results, self.requests, self.polls = results, [], 0
+        self.files = SimpleNamespace(create=self.create_file, content=self.file_content)
+        self.batches = SimpleNamespace(create=self.create_batch, retrieve=self.retrieve_batch)
+
+    async def create_file(self, file, purpose):
+        self.requests = [json.loads(line) for line in file[1].decode().splitlines()]
+        return SimpleNamespace(id="input")
+
+    async def create_batch(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id="batch", status="validating", output_file_id=None, error_file_id=None)
+
+    async def retrieve_batch(self, batch_id):
+        self.polls += 1
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id="output", error_file_id=None)
+
+    async def file_content(self, file_id):
+        lines = [json.dumps({"custom_id": custom_id, **item}) for custom_id, item in self.results.items()]
+        return SimpleNamespace(text="\n".join(lines))
+
+
+@pytest.fixture
+def provider():
+    return OpenAIProvider("5-nano")
+
+
+async def test_batch_results_keep_thread_order_and_per_thread_errors(provider):
+    provider.client = server = FakeBatchServer(
+        {
+            "3": {"response": {"status_code": 500, "body": {"error": {"message": "server exploded"}}}},
+            "0": {"response": {"status_code": 200, "body": response_body('{"value": 1}')}},
+            "1": {"response": {"status_code": 200, "body": {"unexpected": True}}},
+            "2": {"response": {"status_code": 200, "body": response_body('{"value": "x"}')}},
+        }
+    )
+    threads = [Thread.add_first_message("user", f"question {i}") for i in range(5)]
+    results = await provider.get_batch_responses(threads, response_format=Answer, poll_interval=0)
+
+    assert server.polls == 1
+    assert [request["custom_id"] for request in server.requests] == ["0", "1", "2", "3", "4"]
+    assert all(request["body"]["model"] == "gpt-5-nano" for request in server.requests)
+    answer, metrics = results[0]
+    assert answer == Answer(value=1)
+    assert (metrics.input_tokens, metrics.output_tokens) == (10, 5)
+    assert all(isinstance(result, ValueError) for result in results[1:3])
+    assert str(results[3]) == "server exploded"
+    assert "returned no result" in str(results[4])
@@ -1 +1,5 @@
 from database_dimension.mongodb.base_model import MongoDBBaseModel
+from database_dimension.mongodb.client import MongoDBClientManager, get_mongodb_client
+from database_dimension.mongodb.supports.bulk_write_summary import BulkWriteSummary
+from database_dimension.mongodb.supports.document_cache import DocumentCache
+from database_dimension.mongodb.supports.index_definition import IndexDefinition
@@ -1,56 +1,303 @@
+import asyncio
 from datetime import timezone
-from typing import Annotated, ClassVar, Self
+from functools import cache
+from typing import Annotated, Any, AsyncIterator, ClassVar, Iterable, Self
 
 from bson import ObjectId
 from bson.codec_options import CodecOptions
-from pydantic import AliasChoices, BaseModel, BeforeValidator, Field
+from pydantic import AliasChoices, BaseModel, BeforeValidator, Field, TypeAdapter, create_model
+from pydantic.fields import FieldInfo
+from pymongo import InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from dev_pytopia import Logger
 
 from .client import get_mongodb_client
+from .supports.bulk_write_summary import BulkWriteSummary
+from .supports.document_cache import DocumentCache
+from .supports.index_definition import IndexDefinition
+
+_LOGGER = Logger("CONCERN")
+
+
+def _lookup_path(document: dict[str, Any], path: str) -> Any:
+    for part in path.split("."):
+        if not isinstance(document, dict):
+            return None
+        document = document.get(part)
+    return document
 
 
 class MongoDBBaseModel(BaseModel):
     _codec_options: ClassVar[CodecOptions] = CodecOptions(tz_aware=True, tzinfo=timezone.utc)
+    indexes: ClassVar[list[IndexDefinition]] = []
+    _document_cache: ClassVar[DocumentCache | None] = None
+    _client_name: ClassVar[str] = "default"
+    bulk_write_concurrency: ClassVar[int] = 4
 
     id: Annotated[
         str | None, BeforeValidator(lambda value: str(value) if isinstance(value, ObjectId) else value)
     ] = Field(None, validation_alias=AliasChoices("_id", "id"))
 
-    def __init_subclass__(cls, collection=None, database=None, **kwargs):
+    def __init_subclass__(
+        cls,
+        collection=None,
+        database=None,
+        client=None,
+        cache_ttl=None,
+        cache_size=1024,
+        cache_backend="memory",
+        cache_path=None,
+        **kwargs,
+    ):
         super().__init_subclass__(**kwargs)
-        for attr, value in [("_collection_name", collection), ("_database_name", database)]:
+        for attr, value in [
+            ("_collection_name", collection),
+            ("_database_name", database),
+            ("_client_name", client),
+        ]:
             if value:
                 setattr(cls, attr, value)
+        if cache_ttl:
+            cls._document_cache = DocumentCache(
+                f"{getattr(cls, '_database_name', None)}.{getattr(cls, '_collection_name', cls.__name__)}",
+                cache_ttl,
+                max_entries=cache_size,
+                backend=cache_backend,
+                path=cache_path,
+                codec_options=cls._codec_options,
+            )
 
     def to_document(self):
         return self.model_dump(mode="python", exclude_none=True, exclude={"id"})
 
+    @classmethod
+    @cache
+    def _list_adapter(cls) -> TypeAdapter:
+        return TypeAdapter(list[cls])
+
+    @classmethod
+    def to_documents(cls, models: list[Self]) -> list[dict[str, Any]]:
+        if cls.to_document is not MongoDBBaseModel.to_document or any(type(m) is not cls for m in models):
+            return [model.to_document() for model in models]
+        return cls._list_adapter().dump_python(
+            models, mode="python", exclude_none=True, exclude={"__all__": {"id"}}
+        )
+
     @classmethod
     def collection(cls):
-        return get_mongodb_client()[cls._database_name].get_collection(
+        return get_mongodb_client(cls._client_name)[cls._database_name].get_collection(
             cls._collection_name, codec_options=cls._codec_options
         )
 
+    @classmethod
+    async def ensure_indexes(cls, *, dry_run: bool = False, drop_extra: bool = False) -> dict[str, list[str]]:
+        collection = cls.collection()
+        existing = {
+            name: IndexDefinition.spec_from_server(info)
+            for name, info in (await collection.index_information()).items()
+            if name != "_id_"
+        }
+        declared = {index.index_name: index for index in cls.indexes}
+        diff = {
+            "create": [name for name in declared if name not in existing],
+            "changed": [name for name, i in declared.items() if name in existing and existing[name] != i.spec()],
+            "extra": [name for name in existing if name not in declared],
+        }
+        if dry_run:
+            return diff
+        for name in diff["changed"] + (diff["extra"] if drop_extra else []):
+            await collection.drop_index(name)
+        if to_create := [declared[name].to_index_model() for name in diff["create"] + diff["changed"]]:
+            await collection.create_indexes(to_create)
+        return diff
+
+    @classmethod
+    def _indexed_models(cls) -> dict[tuple[str, str], type[Self]]:
+        models, stack = {}, [cls]
+        while stack:
+            model = stack.pop()
+            stack.extend(model.__subclasses__())
+            database, collection = getattr(model, "_database_name", None), getattr(model, "_collection_name", None)
+            if model.indexes and database and collection:
+                models.setdefault((database, collection), model)
+            elif model.indexes and "indexes" in vars(model):
+                _LOGGER.concern(f"[MongoDBBaseModel] Skipping indexes of {model.__name__}: no collection binding")
+        return models
+
+    @classmethod
+    async def ensure_all_indexes(cls, *, dry_run: bool = False, drop_extra: bool = False) -> dict[str, dict]:
+        models = cls._indexed_models()
+        diffs = await asyncio.gather(
+            *(model.ensure_indexes(dry_run=dry_run, drop_extra=drop_extra) for model in models.values())
+        )
+        return {f"{database}.{collection}": diff for (database, collection), diff in zip(models, diffs)}
+
     @classmethod
     async def find_one(cls, query=None) -> Self | None:
         query = {"_id": query} if isinstance(query, str) else (query or {})
-        return cls.model_validate(document) if (document := await cls.collection().find_one(query)) else None
+        if (document_cache := cls._document_cache) is None:
+            return cls.model_validate(document) if (document := await cls.collection().find_one(query)) else None
+        hit, document = document_cache.get(key := DocumentCache.build_key(query))
+        if not hit:
+            generation = document_cache.generation
+            document_cache.set(key, document := await cls.collection().find_one(query), generation)
+        return cls.model_validate(document) if document else None
+
+    @classmethod
+    def cache_stats(cls) -> dict[str, Any]:
+        return cls._document_cache.stats() if cls._document_cache else {}
+
+    @classmethod
+    def _invalidate_cache(cls, ids=None, query=None, many=False) -> None:
+        if cls._document_cache is None:
+            return
+        if query is not None:
+            cls._document_cache.invalidate_query(query, many=many)
+        else:
+            cls._document_cache.invalidate(ids)
+
+    @classmethod
+    @cache
+    def partial_model(cls) -> type[Self]:
+        optional = lambda field: FieldInfo.merge_field_infos(field, default=None, default_factory=None)
+        return create_model(
+            f"Partial{cls.__name__}",
+            __base__=cls,
+            **{name: (f.annotation | None, optional(f)) for name, f in cls.model_fields.items() if name != "id"},
+        )
+
+    @classmethod
+    async def find_iter(
+        cls,
+        query=None,
+        *,
+        projection=None,
+        sort=None,
+        limit=0,
+        skip=0,
+        batch_size=0,
+        hint=None,
+        raw=False,
+    ) -> AsyncIterator[Self | dict[str, Any]]:
+        cursor = cls.collection().find(
+            query or {},
+            projection=projection,
+            sort=sort,
+            limit=limit,
+            skip=skip,
+            batch_size=batch_size,
+            **({"hint": hint} if hint else {}),
+        )
+        if raw:
+            async for document in cursor:
+                yield document
+            return
+        model = cls.partial_model() if projection else cls
+        async for document in cursor:
+            yield model.model_validate(document)
+
+    stream = find_iter
 
     @classmethod
     async def find(cls, query=None, sort=None, limit=0) -> list[Self]:
-        return [
-            cls.model_validate(document)
-            async for document in cls.collection().find(query or {}, sort=sort, limit=limit)
-        ]
+        return [document async for document in cls.find_iter(query, sort=sort, limit=limit)]
 
     async def save(self):
         self.id = self.id or str(ObjectId())
         await type(self).collection().replace_one({"_id": self.id}, self.to_document(), upsert=True)
+        type(self)._invalidate_cache([self.id])
         return self.id
 
+    @classmethod
+    async def _bulk_write(cls, operations: list, ids: list, *, ordered: bool, chunk_size: int) -> BulkWriteSummary:
+        summary, collection = BulkWriteSummary(), cls.collection()
+        pool_size = collection.database.client.options.pool_options.max_pool_size
+        semaphore = asyncio.Semaphore(max(1, min(cls.bulk_write_concurrency, pool_size)))
+
+        async def write(offset: int) -> bool:
+            try:
+                async with semaphore:
+                    result = await collection.bulk_write(operations[offset : offset + chunk_size], ordered=ordered)
+            except BulkWriteError as e:
+                summary.add(e.details, ids[offset : offset + chunk_size], offset)
+                return False
+            summary.add(result.bulk_api_result, ids[offset : offset + chunk_size], offset)
+            return True
+
+        offsets = range(0, len(operations), chunk_size)
+        try:
+            if not ordered:
+                await asyncio.gather(*(write(offset) for offset in offsets))
+                return summary
+            for offset in offsets:
+                if not await write(offset):
+                    break
+            return summary
+        finally:
+            cls._invalidate_cache(ids if all(isinstance(i, str) for i in ids) else None)
+
+    @classmethod
+    async def insert_many(
+        cls, models: Iterable[Self], *, ordered: bool = True, chunk_size: int = 1000
+    ) -> BulkWriteSummary:
+        models = list(models)
+        for model in models:
+            model.id = model.id or str(ObjectId())
+        operations = [InsertOne({"_id": m.id, **d}) for m, d in zip(models, cls.to_documents(models))]
+        return await cls._bulk_write(operations, [m.id for m in models], ordered=ordered, chunk_size=chunk_size)
+
+    @classmethod
+    async def save_many(
+        cls, models: Iterable[Self], *, ordered: bool = False, chunk_size: int = 1000
+    ) -> BulkWriteSummary:
+        models = list(models)
+        for model in models:
+            model.id = model.id or str(ObjectId())
+        operations = [ReplaceOne({"_id": m.id}, d, upsert=True) for m, d in zip(models, cls.to_documents(models))]
+        return await cls._bulk_write(operations, [m.id for m in models], ordered=ordered, chunk_size=chunk_size)
+
+    @classmethod
+    async def bulk_upsert(
+        cls,
+        models: Iterable[Self],
+        key: str | tuple[str, ...] = "_id",
+        *,
+        ordered: bool = False,
+        chunk_size: int = 1000,
+    ) -> BulkWriteSummary:
+        models, keys = list(models), (key,) if isinstance(key, str) else key
+        if "_id" in keys:
+            for model in models:
+                model.id = model.id or str(ObjectId())
+        positions, filters, operations, missing = [], [], [], []
+        for position, (model, document) in enumerate(zip(models, cls.to_documents(models))):
+            values = {k: model.id if k == "_id" else _lookup_path(document, k) for k in keys}
+            if absent := [k for k, value in values.items() if value is None]:
+                missing.append(
+                    {"index": position, "id": model.id, "code": None, "message": f"missing key fields {absent}"}
+                )
+                continue
+            insert_id = {} if "_id" in values else {"$setOnInsert": {"_id": model.id or str(ObjectId())}}
+            operations.append(UpdateOne(values, {"$set": document, **insert_id}, upsert=True))
+            positions.append(position)
+            filters.append(values)
+        summary = await cls._bulk_write(operations, filters, ordered=ordered, chunk_size=chunk_size)
+        for error in summary.errors:
+            error["index"] = positions[error["index"]]
+        summary.upserted_ids = {positions[index]: upserted for index, upserted in summary.upserted_ids.items()}
+        for position, upserted_id in summary.upserted_ids.items():
+            models[position].id = str(upserted_id)
+        summary.errors = sorted(summary.errors + missing, key=lambda error: error["index"])
+        return summary
+
     @staticmethod
     def _collection_operation(name):
         async def operation(cls, query, *args, **kwargs):
-            return await getattr(cls.collection(), name)(query, *args, **kwargs)
+            try:
+                return await getattr(cls.collection(), name)(query, *args, **kwargs)
+            finally:
+                cls._invalidate_cache(query=query, many=name.endswith("_many"))
 
         return classmethod(operation)
 
@@ -1,11 +1,72 @@
-from functools import cache
-from os import getenv
+import asyncio
+from os import getenv, getpid
+from typing import Any, ClassVar
 
 from pymongo import AsyncMongoClient
 
+from .supports.connection_pool_stats import ConnectionPoolStats
 
-@cache
-def get_mongodb_client():
-    return AsyncMongoClient(
-        f"mongodb+srv://{getenv('MONGODB_ATLAS_USERNAME')}:{getenv('MONGODB_ATLAS_PASSWORD')}@{getenv('MONGODB_ATLAS_CLUSTER_ADDRESS')}/?retryWrites=true&w=majority&appName={getenv('MONGODB_ATLAS_CLUSTER_NAME')}"
-    )
+_POOL_OPTIONS = {
+    "MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MIN_POOL_SIZE": ("minPoolSize", int),
+    "MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "MAX_CONNECTING": ("maxConnecting", int),
+    "COMPRESSORS": ("compressors", str),
+    "READ_PREFERENCE": ("readPreference", str),
+}
+
+
+class MongoDBClientManager:
+    _clients: ClassVar[dict[str, tuple[int, AsyncMongoClient, ConnectionPoolStats]]] = {}
+
+    @staticmethod
+    def _env(name: str, key: str) -> str | None:
+        return getenv(f"MONGODB_{key}" if name == "default" else f"MONGODB_{name.upper()}_{key}")
+
+    @classmethod
+    def uri(cls, name: str = "default") -> str:
+        return cls._env(name, "URI") or (
+            f"mongodb+srv://{cls._env(name, 'ATLAS_USERNAME')}:{cls._env(name, 'ATLAS_PASSWORD')}"
+            f"@{cls._env(name, 'ATLAS_CLUSTER_ADDRESS')}/?retryWrites=true&w=majority"
+            f"&appName={cls._env(name, 'ATLAS_CLUSTER_NAME')}"
+        )
+
+    @classmethod
+    def pool_options(cls, name: str = "default") -> dict[str, Any]:
+        return {
+            option: cast(value) for key, (option, cast) in _POOL_OPTIONS.items() if (value := cls._env(name, key))
+        }
+
+    @classmethod
+    def get(cls, name: str = "default") -> AsyncMongoClient:
+        if (entry := cls._clients.get(name)) and entry[0] == getpid():
+            return entry[1]
+        stats = ConnectionPoolStats()
+        client = AsyncMongoClient(cls.uri(name), event_listeners=[stats], **cls.pool_options(name))
+        cls._clients[name] = (getpid(), client, stats)
+        return client
+
+    @classmethod
+    async def warm(cls, name: str = "default", connections: int | None = None) -> None:
+        client = cls.get(name)
+        count = connections or cls.pool_options(name).get("minPoolSize") or 1
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(count)))
+
+    @classmethod
+    async def close(cls, name: str | None = None) -> None:
+        for client_name in [name] if name else list(cls._clients):
+            if (entry := cls._clients.pop(client_name, None)) and entry[0] == getpid():
+                await entry[1].close()
+
+    @classmethod
+    def stats(cls) -> dict[str, dict[str, Any]]:
+        return {
+            name: stats.snapshot(client.options.pool_options.max_pool_size)
+            for name, (pid, client, stats) in cls._clients.items()
+            if pid == getpid()
+        }
+
+
+def get_mongodb_client(name: str = "default") -> AsyncMongoClient:
+    return MongoDBClientManager.get(name)
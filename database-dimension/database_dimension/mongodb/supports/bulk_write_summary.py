@@ -0,0 +1,32 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class BulkWriteSummary:
+    inserted: int = 0
+    matched: int = 0
+    modified: int = 0
+    upserted: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    upserted_ids: dict[int, Any] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def add(self, details: dict[str, Any], ids: list[Any], offset: int) -> None:
+        self.inserted += details.get("nInserted", 0)
+        self.matched += details.get("nMatched", 0)
+        self.modified += details.get("nModified", 0)
+        self.upserted += details.get("nUpserted", 0)
+        self.upserted_ids |= {offset + upsert["index"]: upsert["_id"] for upsert in details.get("upserted", [])}
+        self.errors += [
+            {
+                "index": offset + error["index"],
+                "id": ids[error["index"]],
+                "code": error.get("code"),
+                "message": error.get("errmsg"),
+            }
+            for error in details.get("writeErrors", [])
+        ]
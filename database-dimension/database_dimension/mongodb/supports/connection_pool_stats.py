@@ -0,0 +1,56 @@
+from collections import Counter
+from typing import Any
+
+from pymongo import monitoring
+
+
+class ConnectionPoolStats(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self.counts, self.checked_out, self.waiting, self.peak_checked_out = Counter(), 0, 0, 0
+
+    def pool_created(self, event):
+        self.counts["pools_created"] += 1
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.counts["pools_cleared"] += 1
+
+    def pool_closed(self, event):
+        self.counts["pools_closed"] += 1
+
+    def connection_created(self, event):
+        self.counts["connections_created"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.counts["connections_closed"] += 1
+
+    def connection_check_out_started(self, event):
+        self.waiting += 1
+
+    def connection_check_out_failed(self, event):
+        self.waiting -= 1
+        self.counts[f"checkout_failed:{event.reason}"] += 1
+
+    def connection_checked_out(self, event):
+        self.waiting -= 1
+        self.checked_out += 1
+        self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+        self.counts["checkouts"] += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+    def snapshot(self, max_pool_size: int | None = None) -> dict[str, Any]:
+        return {
+            "open_connections": self.counts["connections_created"] - self.counts["connections_closed"],
+            "checked_out": self.checked_out,
+            "waiting": self.waiting,
+            "peak_checked_out": self.peak_checked_out,
+            **({"utilization": self.checked_out / max_pool_size} if max_pool_size else {}),
+            **self.counts,
+        }
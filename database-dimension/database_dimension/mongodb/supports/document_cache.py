@@ -0,0 +1,192 @@
+from collections import OrderedDict
+from pathlib import Path
+import sqlite3
+import time
+from typing import Any, Iterable
+
+import bson
+from bson import json_util
+from bson.codec_options import CodecOptions
+
+
+class _MemoryBackend:
+    def __init__(self, max_entries: int):
+        self.max_entries, self._entries, self._keys_by_id = max_entries, OrderedDict(), {}
+
+    def get(self, key: str) -> tuple[dict | None, float] | None:
+        if (entry := self._entries.get(key)) is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1:]
+
+    def document_id(self, key: str) -> str | None:
+        return entry[0] if (entry := self._entries.get(key)) else None
+
+    def set(self, key: str, document_id: str | None, document: dict | None, expires_at: float) -> None:
+        self._delete(key)
+        self._entries[key] = (document_id, document, expires_at)
+        self._keys_by_id.setdefault(document_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._delete(next(iter(self._entries)))
+
+    def _delete(self, key: str) -> bool:
+        if (entry := self._entries.pop(key, None)) is None:
+            return False
+        keys = self._keys_by_id[entry[0]]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_id[entry[0]]
+        return True
+
+    def invalidate(self, document_ids: Iterable[str]) -> int:
+        keys = {key for i in [*document_ids, None] for key in self._keys_by_id.get(i, ())}
+        return sum(self._delete(key) for key in keys)
+
+    def clear(self) -> int:
+        count = len(self._entries)
+        self._entries.clear()
+        self._keys_by_id.clear()
+        return count
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _SQLiteBackend:
+    def __init__(self, path: Path, namespace: str, max_entries: int, codec_options: CodecOptions):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.namespace, self.max_entries, self.codec_options = namespace, max_entries, codec_options
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS documents (namespace TEXT, key TEXT, document_id TEXT, document BLOB, "
+            "expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        for name, column in [("by_id", "document_id"), ("by_expiry", "expires_at")]:
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS documents_{name} ON documents (namespace, {column})"
+            )
+
+    def get(self, key: str) -> tuple[dict | None, float] | None:
+        row = self._connection.execute(
+            "SELECT document, expires_at FROM documents WHERE namespace = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        if not row:
+            return None
+        return (bson.decode(row[0], self.codec_options) if row[0] else None), row[1]
+
+    def document_id(self, key: str) -> str | None:
+        row = self._connection.execute(
+            "SELECT document_id FROM documents WHERE namespace = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, document_id: str | None, document: dict | None, expires_at: float) -> None:
+        self._connection.execute("BEGIN")
+        try:
+            self._connection.execute(
+                "DELETE FROM documents WHERE namespace = ? AND expires_at < ?", (self.namespace, time.time())
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, document_id, bson.encode(document) if document else None, expires_at),
+            )
+            self._connection.execute(
+                "DELETE FROM documents WHERE namespace = ? AND key IN (SELECT key FROM documents "
+                "WHERE namespace = ? ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_entries),
+            )
+        except Exception:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def invalidate(self, document_ids: Iterable[str]) -> int:
+        ids = list(document_ids)
+        return self._connection.execute(
+            f"DELETE FROM documents WHERE namespace = ? AND (document_id IS NULL OR document_id IN "
+            f"({','.join('?' * len(ids))}))",
+            (self.namespace, *ids),
+        ).rowcount
+
+    def clear(self) -> int:
+        return self._connection.execute("DELETE FROM documents WHERE namespace = ?", (self.namespace,)).rowcount
+
+    def __len__(self) -> int:
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM documents WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+
+def _ids_from_query(query: dict) -> list | None:
+    if set(query) != {"_id"}:
+        return None
+    if not isinstance(value := query["_id"], dict):
+        return [value]
+    return value["$in"] if set(value) == {"$in"} else None
+
+
+class DocumentCache:
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: float,
+        *,
+        max_entries: int = 1024,
+        backend: str = "memory",
+        path: str | Path | None = None,
+        codec_options: CodecOptions | None = None,
+    ):
+        self.ttl_seconds, self.hits, self.misses, self.invalidations, self.generation = ttl_seconds, 0, 0, 0, 0
+        self._backend = (
+            _SQLiteBackend(
+                Path(path or Path.home() / ".cache" / "database_dimension" / "documents.sqlite3"),
+                namespace,
+                max_entries,
+                codec_options or CodecOptions(),
+            )
+            if backend == "sqlite"
+            else _MemoryBackend(max_entries)
+        )
+
+    @staticmethod
+    def build_key(query: dict) -> str:
+        return json_util.dumps(query, sort_keys=True)
+
+    def get(self, key: str) -> tuple[bool, dict | None]:
+        if (entry := self._backend.get(key)) is None or entry[1] < time.time():
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, entry[0]
+
+    def set(self, key: str, document: dict | None, generation: int | None = None) -> None:
+        if generation is not None and generation != self.generation:
+            return
+        document_id = str(document["_id"]) if document else None
+        self._backend.set(key, document_id, document, time.time() + self.ttl_seconds)
+
+    def invalidate(self, document_ids: Iterable | None = None) -> None:
+        self.generation += 1
+        self.invalidations += (
+            self._backend.clear()
+            if document_ids is None
+            else self._backend.invalidate({str(document_id) for document_id in document_ids})
+        )
+
+    def invalidate_query(self, query: dict | None, *, many: bool = False) -> None:
+        if (ids := _ids_from_query(query or {})) is not None:
+            return self.invalidate(ids)
+        if not many and (document_id := self._backend.document_id(self.build_key(query or {}))):
+            return self.invalidate([document_id])
+        self.invalidate()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "size": len(self._backend),
+        }
@@ -0,0 +1,49 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from pymongo import IndexModel
+
+_OPTION_NAMES = {
+    "unique": "unique",
+    "sparse": "sparse",
+    "partial_filter": "partialFilterExpression",
+    "expire_after_seconds": "expireAfterSeconds",
+}
+
+
+def _is_set(value: Any) -> bool:
+    return value is not None and value is not False
+
+
+@dataclass(frozen=True)
+class IndexDefinition:
+    keys: str | list[tuple[str, int | str]]
+    name: str | None = None
+    unique: bool = False
+    sparse: bool = False
+    partial_filter: dict[str, Any] | None = field(default=None, hash=False)
+    expire_after_seconds: int | None = None
+
+    @property
+    def key_list(self) -> list[tuple[str, int | str]]:
+        return [(self.keys, 1)] if isinstance(self.keys, str) else [tuple(k) for k in self.keys]
+
+    @property
+    def index_name(self) -> str:
+        return self.name or "_".join(f"{k}_{d}" for k, d in self.key_list)
+
+    def options(self) -> dict[str, Any]:
+        return {mongo: value for attr, mongo in _OPTION_NAMES.items() if _is_set(value := getattr(self, attr))}
+
+    def to_index_model(self) -> IndexModel:
+        return IndexModel(self.key_list, name=self.index_name, **self.options())
+
+    def spec(self) -> dict[str, Any]:
+        return {"key": self.key_list, **self.options()}
+
+    @staticmethod
+    def spec_from_server(info: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "key": [(k, int(d) if isinstance(d, float) else d) for k, d in info["key"]],
+            **{mongo: info[mongo] for mongo in _OPTION_NAMES.values() if _is_set(info.get(mongo))},
+        }
@@ -0,0 +1,25 @@
+import asyncio
+import importlib
+
+import click
+from dotenv import find_dotenv, load_dotenv
+
+from ....mongodb.base_model import MongoDBBaseModel
+
+COMMAND_SETTINGS = {"help": "Diff declared model indexes against MongoDB and optionally apply them."}
+
+
+@click.option("--module", "-m", "modules", multiple=True, help="Module that defines models (repeatable).")
+@click.option("--apply", is_flag=True, help="Create/rebuild indexes instead of only printing the diff.")
+@click.option("--drop-extra", is_flag=True, help="With --apply, also drop indexes that are not declared.")
+def main(modules, apply, drop_extra):
+    load_dotenv(find_dotenv(usecwd=True))
+    for module in modules:
+        importlib.import_module(module)
+    diffs = asyncio.run(MongoDBBaseModel.ensure_all_indexes(dry_run=not apply, drop_extra=drop_extra))
+    for namespace, diff in sorted(diffs.items()):
+        click.echo(namespace)
+        for action, names in diff.items():
+            for name in names:
+                click.echo(f"  {action:<8}{name}")
+    click.echo(f"{'Applied' if apply else 'Dry run:'} {len(diffs)} collections checked")
@@ -0,0 +1,29 @@
+import asyncio
+
+from database_dimension import MongoDBBaseModel
+
+
+class Cached(MongoDBBaseModel, database="tests", collection="cached", cache_ttl=60):
+    name: str
+
+
+class RacingCollection:
+    def __init__(self):
+        self.documents = {"a": {"_id": "a", "name": "old"}}
+
+    async def find_one(self, query):
+        document = dict(self.documents[query["_id"]])
+        await Cached.update_one({"_id": "a"}, {"$set": {"name": "new"}})
+        return document
+
+    async def update_one(self, query, update):
+        self.documents[query["_id"]] |= update["$set"]
+
+
+def test_find_one_does_not_cache_a_document_invalidated_during_the_fetch(monkeypatch):
+    collection = RacingCollection()
+    monkeypatch.setattr(Cached, "collection", classmethod(lambda cls: collection))
+    assert asyncio.run(Cached.find_one("a")).name == "old"
+    monkeypatch.setattr(collection, "find_one", lambda query: asyncio.sleep(0, collection.documents["a"]))
+    assert asyncio.run(Cached.find_one("a")).name == "new"
+    assert Cached.cache_stats()["size"] == 1
@@ -0,0 +1,19 @@
+from database_dimension import IndexDefinition
+
+
+def test_zero_expire_after_seconds_builds_a_ttl_index():
+    index = IndexDefinition("expires_at", expire_after_seconds=0)
+    assert index.to_index_model().document["expireAfterSeconds"] == 0
+    assert index.spec() == {"key": [("expires_at", 1)], "expireAfterSeconds": 0}
+
+
+def test_server_spec_keeps_zero_ttl_and_drops_false_flags():
+    info = {"v": 2, "key": [("expires_at", 1.0)], "expireAfterSeconds": 0, "sparse": False}
+    assert IndexDefinition.spec_from_server(info) == IndexDefinition("expires_at", expire_after_seconds=0).spec()
+    assert IndexDefinition.spec_from_server(info) != IndexDefinition("expires_at").spec()
+
+
+def test_unset_options_are_omitted():
+    index = IndexDefinition([("user_id", 1), ("created_at", -1)])
+    assert index.spec() == {"key": [("user_id", 1), ("created_at", -1)]}
+    assert index.index_name == "user_id_1_created_at_-1"
@@ -0,0 +1,25 @@
+from database_dimension import MongoDBBaseModel
+from pydantic import Field, field_validator
+
+
+class Aliased(MongoDBBaseModel, database="tests", collection="aliased"):
+    content: str
+    user_id: str = Field(serialization_alias="userId", validation_alias="userId")
+    processed: bool = Field(default=False, exclude=True)
+
+    @field_validator("content")
+    @classmethod
+    def strip_content(cls, value: str) -> str:
+        return value.strip()
+
+
+def test_partial_model_keeps_aliases_validators_and_exclude():
+    partial = Aliased.partial_model().model_validate({"_id": "a", "userId": "u1", "content": " text "})
+    assert (partial.id, partial.user_id, partial.content) == ("a", "u1", "text")
+    assert partial.to_document() == {"content": "text", "user_id": "u1"}
+    assert partial.model_dump(by_alias=True, exclude_none=True)["userId"] == "u1"
+
+
+def test_partial_model_allows_missing_fields():
+    partial = Aliased.partial_model().model_validate({"_id": "a", "userId": "u1"})
+    assert partial.content is None and partial.processed is None
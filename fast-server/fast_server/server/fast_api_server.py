@@ -6,13 +6,16 @@ import time
 from typing import Awaitable, Callable
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 import uvicorn
 
-from dev_pytopia import with_error_handling
+from dev_pytopia import Logger, with_error_handling
 from fast_server.api_operation_framework.operations.initialize_and_register_api_operations import (
     InitializeAndRegisterAPIOperations,
 )
 
+_LOGGER = Logger("ERROR")
+
 
 @with_error_handling
 class FastAPIServer:
@@ -24,7 +27,7 @@ class FastAPIServer:
         extra_operations: list[type] | None = None,
     ):
         self.port = port or int(os.getenv("PORT", os.getenv("FASTAPI_SERVER_PORT")))
-        self.host, self._startup_hooks = host, []
+        self.host, self._startup_hooks, self._shutdown_hooks, self._metrics_routes = host, [], [], []
         self.api_operations_path = (
             api_operations_path or Path(sys.modules["__main__"].__file__).parent / "api/rest_api"
         )
@@ -32,9 +35,27 @@ class FastAPIServer:
 
     async def _lifespan(self, server):
         await InitializeAndRegisterAPIOperations(server, self.api_operations_path, self.extra_operations)
+        for path, render in self._metrics_routes:
+            server.add_api_route(path, self._metrics_endpoint(render), methods=["GET"], include_in_schema=False)
         for hook in self._startup_hooks:
             await hook()
-        yield
+        try:
+            yield
+        finally:
+            for hook in reversed(self._shutdown_hooks):
+                try:
+                    await hook()
+                except Exception as e:
+                    _LOGGER.error(
+                        f"[FastAPIServer] Shutdown hook {getattr(hook, '__qualname__', hook)} failed: {e}"
+                    )
+
+    @staticmethod
+    def _metrics_endpoint(render: Callable[[], str]) -> Callable[[], PlainTextResponse]:
+        def endpoint() -> PlainTextResponse:
+            return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+        return endpoint
 
     def run(self, kill_existing: bool = True):
         if (
@@ -47,3 +68,9 @@ class FastAPIServer:
 
     def add_startup_hook(self, hook: Callable[[], Awaitable[None]]):
         self._startup_hooks.append(hook)
+
+    def add_shutdown_hook(self, hook: Callable[[], Awaitable[None]]):
+        self._shutdown_hooks.append(hook)
+
+    def mount_metrics(self, render: Callable[[], str], path: str = "/metrics"):
+        self._metrics_routes.append((path, render))
@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
+from typing import ClassVar
 
-from database_dimension import MongoDBBaseModel
+from database_dimension import IndexDefinition, MongoDBBaseModel
 from pydantic import Field
 
 
@@ -10,6 +11,8 @@ class Idea(MongoDBBaseModel, collection="ideas", database="user_data"):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     processed_at: datetime | None = Field(default=None, exclude=True)
 
+    indexes: ClassVar[list[IndexDefinition]] = [IndexDefinition([("processed_at", 1), ("created_at", -1)])]
+
     @classmethod
     async def pop_unprocessed(cls) -> list["Idea"]:
         ideas = await cls.find({"processed_at": None}, sort=[("created_at", -1)])
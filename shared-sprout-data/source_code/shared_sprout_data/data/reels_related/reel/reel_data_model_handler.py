@@ -31,5 +31,19 @@ class Reel(MongoDBBaseModel):
     is_active: bool = True
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+    def to_embedding_text(self) -> str:
+        return "\n".join(
+            f"{label}: {value}"
+            for label, value in [
+                ("Description", self.description),
+                ("Dish", self.dish_type),
+                ("Cuisine", self.cuisine),
+                ("Tags", ", ".join(self.tags)),
+                ("Dietary", ", ".join(self.dietary_tags)),
+                ("Flavor", ", ".join(self.flavor_profile)),
+            ]
+            if value
+        )
+
 class ReelDataModelHandler:
     pass
@@ -1,8 +1,8 @@
 from datetime import datetime
-from typing import Optional
+from typing import ClassVar, Optional
 from pydantic import BaseModel
 
-from database_dimension import MongoDBBaseModel
+from database_dimension import IndexDefinition, MongoDBBaseModel
 
 from ...shared.recipe_enumerations import DietType, RecipeComplexity
 
@@ -44,3 +44,5 @@ class User(MongoDBBaseModel, database="sprout_data", collection="users"):
     identity: UserIdentity | None = None
     preferences: UserPreferences
     points: float = 0
+
+    indexes: ClassVar[list[IndexDefinition]] = [IndexDefinition("account.user_id")]
@@ -1,8 +1,13 @@
-from database_dimension import MongoDBBaseModel
-from typing import Optional
+from database_dimension import IndexDefinition, MongoDBBaseModel
+from typing import ClassVar, Optional
 from datetime import datetime
 
 class Transaction(MongoDBBaseModel):
+    indexes: ClassVar[list[IndexDefinition]] = [
+        IndexDefinition([("user_id", 1), ("created_at", -1)]),
+        IndexDefinition("reference_id", unique=True, partial_filter={"reference_id": {"$type": "string"}}),
+    ]
+
     user_id: str
     amount: float
     currency: str = "USD"
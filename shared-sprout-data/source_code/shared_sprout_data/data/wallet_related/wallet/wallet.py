@@ -1,8 +1,10 @@
-from database_dimension import MongoDBBaseModel
-from typing import Optional
+from database_dimension import IndexDefinition, MongoDBBaseModel
+from typing import ClassVar, Optional
 from datetime import datetime
 
 class Wallet(MongoDBBaseModel):
+    indexes: ClassVar[list[IndexDefinition]] = [IndexDefinition("user_id", unique=True)]
+
     user_id: str
     available_balance: float = 0.0
     pending_balance: float = 0.0